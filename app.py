@@ -4,28 +4,38 @@ UltraOS v2.237 - Sunsettling
 Requis: pip install customtkinter pillow psutil pywebview PyQt5 PyQtWebEngine
 """
 
-from PyQt5.QtWidgets import (
-    QApplication, QMainWindow, QTabWidget, QWidget,
-    QVBoxLayout, QPushButton, QLineEdit, QHBoxLayout
-)
-from PyQt5.QtWebEngineWidgets import QWebEngineView
-from PyQt5.QtCore import QUrl
 import customtkinter as ctk
 from tkinter import messagebox, filedialog, scrolledtext
 import tkinter as tk
 import os
 import time
 import threading
+import multiprocessing
+import shlex
+import shutil
 import subprocess
+import tracemalloc
 import webbrowser
 from datetime import datetime
 import psutil
 from PIL import Image, ImageDraw
 import io
+import errno
+import gc
+import hashlib
+import heapq
+import inspect
+import json
+import mmap
+import queue
+import marshal
+import zlib
 import random
 import math
 import sys
-local_file = os.path.abspath("newtab.html")
+from pathlib import Path
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
 
 # Color scheme
 COLORS = {
@@ -42,6 +52,89 @@ COLORS = {
 ctk.set_appearance_mode("dark")
 ctk.set_default_color_theme("dark-blue")
 
+APP_DATA = os.path.join(os.path.dirname(os.path.abspath(__file__)), "app_data")
+PROFILES_PATH = os.path.join(APP_DATA, "profiles.json")
+WALLPAPER_CACHE = os.path.join(APP_DATA, "wallpaper.png")
+SESSION_PATH = os.path.join(APP_DATA, "session.bin")
+HASH_CACHE_PATH = os.path.join(APP_DATA, "hash_cache.bin")
+TRANSFERS_PATH = os.path.join(APP_DATA, "transfers.json")
+MEMORY_LOG_PATH = os.path.join(APP_DATA, "memory_log.jsonl")
+EDITOR_PAGE = 1024 * 1024  # bytes of a document shown in the Text Editor at once
+
+# Boot profiles. app_data/profiles.json overrides these values per mode.
+#   wallpaper: "generated" (new each boot), "cached" (app_data/wallpaper.png) or "none"
+#   prewarm: apps warmed up in the background after boot: "open_task_manager"
+#            (primes psutil's CPU counters) and "open_browser" (imports PyQt)
+DEFAULT_PROFILES = {
+    "normal": {
+        "wallpaper": "generated",
+        "desktop_files": True,
+        "clock_interval": 1,
+        "taskmgr_interval": 3,
+        "prewarm": ["open_task_manager"],
+        "qt": True,
+        "app_host": False,
+        "scrollback": 10000,
+        "disk_tool": False,
+        "memory_tracing": False,
+        "memory_dump_interval": 0,  # s, 0 = off
+    },
+    "safe": {
+        "wallpaper": "none",
+        "desktop_files": False,
+        "clock_interval": 30,
+        "taskmgr_interval": 10,
+        "prewarm": [],
+        "qt": False,
+        "app_host": False,
+        "scrollback": 1000,
+        "disk_tool": False,
+    },
+    "recovery": {
+        "wallpaper": "none",
+        "desktop_files": False,
+        "clock_interval": 30,
+        "taskmgr_interval": 10,
+        "prewarm": [],
+        "qt": False,
+        "app_host": False,
+        "scrollback": 2000,
+        "disk_tool": True,
+    },
+}
+
+
+def load_profile(mode):
+    """Return the boot profile for `mode` (defaults + app_data/profiles.json)."""
+    profiles = {name: dict(values) for name, values in DEFAULT_PROFILES.items()}
+    try:
+        with open(PROFILES_PATH, "r", encoding="utf-8") as f:
+            custom = json.load(f)
+    except FileNotFoundError:
+        custom = {}
+        try:
+            os.makedirs(APP_DATA, exist_ok=True)
+            with open(PROFILES_PATH, "w", encoding="utf-8") as f:
+                json.dump(DEFAULT_PROFILES, f, indent=4)
+        except OSError:
+            pass
+    except (OSError, ValueError) as e:
+        print(f"Profiles error: {e}")
+        custom = {}
+    for name, values in custom.items():
+        profiles.setdefault(name, {}).update(values)
+    profile = dict(DEFAULT_PROFILES["normal"])
+    profile.update(profiles.get(mode, {}))
+    return profile
+
+
+# Modules imported in the background to make the first opening faster
+# (tkinter.ttk is already loaded by customtkinter; the task manager's
+# warm-up is the psutil priming in UltraOS._prewarm)
+PREWARM_MODULES = {
+    "open_browser": ["ultraweb"],
+}
+
 
 def create_wallpaper(width=1920, height=1080):
     """Generate randomized wallpaper with shapes and bubbles."""
@@ -85,17 +178,1265 @@ def create_wallpaper(width=1920, height=1080):
     return img
 
 
+class DesktopCompositor:
+    """Draws the desktop (wallpaper, title, icons) as canvas items.
+
+    No widget is embedded in the canvas, so Tk only repaints the bounding
+    box of the items we change. Changes are queued and flushed once per
+    idle cycle, so many updates in the same frame cost a single repaint.
+    Folder icons are paged: only the icons of the page shown are items.
+    """
+
+    ICON_W, ICON_H = 120, 70
+    CELL_W, CELL_H = 110, 90
+    RELAYOUT_DELAY = 100  # ms after the last resize
+
+    def __init__(self, canvas):
+        self.canvas = canvas
+        self.title = None
+        self._damage = {}
+        self._flush_pending = False
+        self._icon_count = 0
+        self._folder = None  # (entries, open_item, origin)
+        self._page = 0
+        self._pages = 1
+        self._relayout = None
+        self.canvas.bind("<Configure>", self._on_resize)
+        self.canvas.bind("<MouseWheel>", lambda e: self.scroll(-1 if e.delta > 0 else 1))
+        self.canvas.bind("<Button-4>", lambda e: self.scroll(-1))
+        self.canvas.bind("<Button-5>", lambda e: self.scroll(1))
+        self.canvas.tag_bind("page_prev", "<ButtonRelease-1>", lambda e: self.scroll(-1))
+        self.canvas.tag_bind("page_next", "<ButtonRelease-1>", lambda e: self.scroll(1))
+
+    # Layers
+
+    def set_wallpaper(self, image):
+        """Show a PhotoImage as the bottom layer (replaces the previous one)."""
+        self.wallpaper = image
+        self.canvas.delete("wallpaper")
+        self.canvas.create_image(0, 0, image=image, anchor="nw", tags=("wallpaper",))
+        self.canvas.tag_lower("wallpaper")
+
+    def add_title(self, text, font=("Inter", 64, "bold"), color=COLORS["accent"]):
+        self.title = self.canvas.create_text(
+            0, 0, text=text, font=font, fill=color, tags=("title",)
+        )
+        self._place_title()
+        return self.title
+
+    def set_title_color(self, color):
+        self.update(self.title, fill=color)
+
+    def _place_title(self):
+        if self.title is not None:
+            w, h = self.canvas.winfo_width(), self.canvas.winfo_height()
+            self.canvas.coords(self.title, w / 2, h * 0.1)
+
+    def _on_resize(self, event):
+        self._place_title()
+        if self._folder:
+            if self._relayout:
+                self.canvas.after_cancel(self._relayout)
+            self._relayout = self.canvas.after(self.RELAYOUT_DELAY, self._layout)
+
+    # Damage tracking
+
+    def update(self, item, **options):
+        """Queue item changes; only the items' rectangles get repainted."""
+        if item is None:
+            return
+        pending = self._damage.setdefault(item, {})
+        for key, value in options.items():
+            if self.canvas.itemcget(item, key) != str(value) or key in pending:
+                pending[key] = value
+        if not pending:
+            del self._damage[item]
+            return
+        if not self._flush_pending:
+            self._flush_pending = True
+            self.canvas.after_idle(self._flush)
+
+    def _flush(self):
+        self._flush_pending = False
+        damage, self._damage = self._damage, {}
+        for item, options in damage.items():
+            self.canvas.itemconfigure(item, **options)
+
+    # Icons
+
+    def add_icon(self, text, command, x, y, width=None, height=None, tags=()):
+        """Draw an icon centered on (x, y) with hover and click handling."""
+        w, h = width or self.ICON_W, height or self.ICON_H
+        self._icon_count += 1
+        tag = f"icon{self._icon_count}"
+        box = self.canvas.create_rectangle(
+            x - w / 2, y - h / 2, x + w / 2, y + h / 2,
+            fill=COLORS["surface"], outline="", tags=("icon", tag) + tags
+        )
+        self.canvas.create_text(
+            x, y, text=text, width=w - 8, fill=COLORS["text"],
+            font=("Inter", 12, "bold"), tags=("icon", tag) + tags
+        )
+        self.canvas.tag_bind(tag, "<Enter>", lambda e: self.update(box, fill=COLORS["accent"]))
+        self.canvas.tag_bind(tag, "<Leave>", lambda e: self.update(box, fill=COLORS["surface"]))
+        self.canvas.tag_bind(tag, "<ButtonRelease-1>", lambda e: command())
+        return box
+
+    def load_folder(self, path, open_item, origin=(400, 160)):
+        """Show one icon per entry of `path` without blocking the desktop.
+
+        The folder is scanned in a thread; the entries are kept and only the
+        page that fits the canvas is drawn (wheel or arrows for the others).
+        """
+        def scan():
+            try:
+                with os.scandir(path) as it:
+                    entries = sorted(
+                        ((e.name, e.path, e.is_dir()) for e in it if not e.name.startswith(".")),
+                        key=lambda e: (not e[2], e[0].lower())
+                    )
+            except OSError:
+                return
+            self.canvas.after(0, lambda: self._show_folder(entries, open_item, origin))
+
+        threading.Thread(target=scan, daemon=True).start()
+
+    def _show_folder(self, entries, open_item, origin):
+        if self.canvas.winfo_exists():
+            self._folder = (entries, open_item, origin)
+            self._page = 0
+            self._layout()
+
+    def scroll(self, pages):
+        page = max(0, min(self._page + pages, self._pages - 1))
+        if self._folder and page != self._page:
+            self._page = page
+            self._layout()
+
+    def _layout(self):
+        """(Re)draw the folder icons of the current page for the canvas size."""
+        self._relayout = None
+        if not self._folder or not self.canvas.winfo_exists():
+            return
+        entries, open_item, (ox, oy) = self._folder
+        # Forget the bindings of the previous page with its items
+        for tag in {t for item in self.canvas.find_withtag("folder")
+                    for t in self.canvas.gettags(item) if t.startswith("icon") and t != "icon"}:
+            for seq in ("<Enter>", "<Leave>", "<ButtonRelease-1>"):
+                self.canvas.tag_unbind(tag, seq)
+        self.canvas.delete("folder")
+        rows = max(1, (self.canvas.winfo_height() - oy - self.CELL_H // 2) // self.CELL_H)
+        cols = max(1, (self.canvas.winfo_width() - ox + self.CELL_W // 2) // self.CELL_W)
+        per_page = rows * cols
+        self._pages = max(1, -(-len(entries) // per_page))
+        self._page = min(self._page, self._pages - 1)
+        first = self._page * per_page
+        for i, (name, p, is_dir) in enumerate(entries[first:first + per_page]):
+            col, row = divmod(i, rows)
+            label = ("📁 " if is_dir else "📄 ") + (name if len(name) <= 24 else name[:21] + "...")
+            self.add_icon(
+                label, lambda p=p: open_item(p),
+                ox + col * self.CELL_W, oy + row * self.CELL_H,
+                width=self.CELL_W - 10, height=self.CELL_H - 20, tags=("folder",)
+            )
+        if self._pages > 1:
+            y = oy + rows * self.CELL_H - self.CELL_H // 3
+            font = ("Inter", 12, "bold")
+            self.canvas.create_text(ox - 30, y, text="◀", fill=COLORS["text"], font=font, tags=("folder", "page_prev"))
+            self.canvas.create_text(ox + 20, y, text=f"{self._page + 1}/{self._pages}",
+                                    fill=COLORS["text"], font=font, tags=("folder",))
+            self.canvas.create_text(ox + 70, y, text="▶", fill=COLORS["text"], font=font, tags=("folder", "page_next"))
+
+
+# Apps that can run in their own process (app-host mode)
+HOSTED_APPS = (
+    "open_file_manager", "open_terminal", "open_text_editor",
+    "open_task_manager", "open_settings", "open_browser", "open_disk_tool",
+)
+
+
+def _app_worker(conn, user):
+    """Entry point of an app-host process.
+
+    Protocol (dicts over a Pipe):
+      shell -> app: {"op": "launch", "app": name}, {"op": "focus"}, {"op": "shutdown"}
+      app -> shell: {"op": "ready", "pid": pid}, {"op": "closed"},
+                    {"op": "transfer", "args": [op, src, dst]}, {"op": "transfers"}
+    The worker waits for "launch" first so it can be spawned ahead of time.
+    """
+    try:
+        msg = conn.recv()
+    except EOFError:
+        return
+    if msg.get("op") != "launch" or msg.get("app") not in HOSTED_APPS:
+        return
+
+    if msg["app"] == "open_browser":
+        # Qt gets the main thread of its own process here
+        from ultraweb import QApplication, QTimer, UltraTabbedBrowser
+        app = QApplication(sys.argv)
+        win = UltraTabbedBrowser()
+        win.show()
+
+        def poll_qt():
+            while conn.poll():
+                op = conn.recv().get("op")
+                if op == "focus":
+                    win.showNormal()
+                    win.raise_()
+                    win.activateWindow()
+                elif op == "shutdown":
+                    app.quit()
+
+        timer = QTimer()
+        timer.timeout.connect(poll_qt)
+        timer.start(100)
+        conn.send({"op": "ready", "pid": os.getpid()})
+        app.exec_()
+    else:
+        shell = UltraOS.__new__(UltraOS)
+        shell.root = ctk.CTk()
+        shell.root.withdraw()
+        shell.mode = msg.get("mode", "normal")
+        shell.profile = load_profile(shell.mode)
+        shell.current_user = user
+        shell.isolate_apps = False
+        shell.app_host = None
+        shell.host_conn = conn  # transfers go to the shell's queue
+        shell.session = None
+        shell.transfers = None
+        shell.memory = MemoryMonitor(shell.root)
+        getattr(shell, msg["app"])()
+
+        def poll_tk():
+            # The app may open more windows (e.g. the disk tool from the
+            # file manager): the process lives until the last one closes
+            wins = [w for w in shell.root.winfo_children() if isinstance(w, tk.Toplevel) and w.winfo_exists()]
+            if not wins:
+                shell.root.destroy()
+                return
+            try:
+                while conn.poll():
+                    op = conn.recv().get("op")
+                    if op == "focus":
+                        for w in wins:
+                            w.deiconify()
+                            w.lift()
+                        wins[-1].focus_force()
+                    elif op == "shutdown":
+                        shell.root.destroy()
+                        return
+            except EOFError:
+                shell.root.destroy()
+                return
+            shell.root.after(100, poll_tk)
+
+        conn.send({"op": "ready", "pid": os.getpid()})
+        shell.root.after(100, poll_tk)
+        shell.root.mainloop()
+
+    try:
+        conn.send({"op": "closed"})
+    except (BrokenPipeError, OSError):
+        pass
+
+
+class AppHost:
+    """Runs apps in separate processes and talks to them over pipes.
+
+    A busy or hung app then only blocks its own process: the desktop keeps
+    running and the app can be killed. One idle worker is kept spawned in
+    advance so opening an app does not pay the interpreter start-up.
+    """
+
+    POLL_MS = 250
+
+    def __init__(self, root, user, mode="normal", spares=1, on_request=None):
+        self.root = root
+        self.user = user
+        self.mode = mode
+        self.spares = spares
+        self.on_request = on_request  # called with the other messages of apps
+        self.apps = {}  # pid -> (name, process, conn)
+        self._idle = []
+        self._ctx = multiprocessing.get_context("spawn")  # never fork a Tk process
+        self._fill_spares()
+        self.root.after(self.POLL_MS, self._poll)
+
+    def _spawn(self):
+        conn, child = self._ctx.Pipe()
+        proc = self._ctx.Process(target=_app_worker, args=(child, self.user), daemon=True)
+        proc.start()
+        child.close()
+        return proc, conn
+
+    def _fill_spares(self):
+        while len(self._idle) < self.spares:
+            self._idle.append(self._spawn())
+
+    def launch(self, name):
+        proc, conn = self._idle.pop(0) if self._idle else self._spawn()
+        conn.send({"op": "launch", "app": name, "mode": self.mode})
+        self.apps[proc.pid] = (name, proc, conn)
+        self.root.after(500, self._fill_spares)
+        return proc.pid
+
+    def focus(self, pid):
+        self._send(pid, {"op": "focus"})
+
+    def kill(self, pid):
+        if pid in self.apps:
+            name, proc, conn = self.apps.pop(pid)
+            if proc.is_alive():
+                proc.kill()
+            conn.close()
+
+    def shutdown_all(self, timeout=2.0):
+        """Ask every app to close; kill those still running after `timeout` s.
+
+        Blocks: it runs when the desktop quits, after which no Tk timer fires.
+        """
+        for pid in list(self.apps):
+            self._send(pid, {"op": "shutdown"})
+        deadline = time.monotonic() + timeout
+        for pid, (name, proc, conn) in list(self.apps.items()):
+            proc.join(max(0, deadline - time.monotonic()))
+            self.kill(pid)
+        for proc, conn in self._idle:  # nothing open in them yet
+            proc.kill()
+        self._idle = []
+
+    def _send(self, pid, msg):
+        if pid in self.apps:
+            try:
+                self.apps[pid][2].send(msg)
+            except (BrokenPipeError, OSError):
+                self.kill(pid)
+
+    def _poll(self):
+        for pid, (name, proc, conn) in list(self.apps.items()):
+            try:
+                while conn.poll():
+                    msg = conn.recv()
+                    if msg.get("op") == "closed":
+                        self.kill(pid)
+                        break
+                    if self.on_request and msg.get("op") != "ready":
+                        self.on_request(msg)
+            except (EOFError, OSError):
+                self.kill(pid)
+                continue
+            if not proc.is_alive():
+                self.kill(pid)
+        self.root.after(self.POLL_MS, self._poll)
+
+
+class SessionStore:
+    """Periodically saves the open windows to app_data/session.bin.
+
+    Each window is kept as a (app, geometry, state) record where state is a
+    zlib-compressed marshal blob. A window's state is only captured and
+    compressed again when it changed, and the file is only rewritten when
+    a record did.
+    """
+
+    MAGIC = b"ULSS1"
+    INTERVAL = 10000  # ms
+
+    def __init__(self, root, path=SESSION_PATH):
+        self.root = root
+        self.path = path
+        self.windows = {}  # win -> [app, capture, changed, geometry, blob]
+        self._dirty = False
+        self.root.after(self.INTERVAL, self._tick)
+
+    def track(self, win, app, capture=dict, changed=None):
+        """Save `win` with the session. `changed()` tells if capture() must run again."""
+        self.windows[win] = [app, capture, changed, None, None]
+        self._dirty = True
+
+    def _tick(self):
+        self.save()
+        self.root.after(self.INTERVAL, self._tick)
+
+    def save(self):
+        for win, entry in list(self.windows.items()):
+            if not win.winfo_exists():
+                del self.windows[win]
+                self._dirty = True
+                continue
+            app, capture, changed, geometry, blob = entry
+            if blob is None or changed is None or changed():
+                new_blob = zlib.compress(marshal.dumps(capture()))
+                if new_blob != blob:
+                    entry[4] = new_blob
+                    self._dirty = True
+            if win.geometry() != geometry:
+                entry[3] = win.geometry()
+                self._dirty = True
+        if not self._dirty:
+            return
+        records = [(app, geometry, blob) for app, _, _, geometry, blob in self.windows.values()]
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            tmp = self.path + ".tmp"
+            with open(tmp, "wb") as f:
+                f.write(self.MAGIC + marshal.dumps(records))
+            os.replace(tmp, self.path)
+            self._dirty = False
+        except OSError as e:
+            print(f"Session error: {e}")
+
+    def load(self):
+        """Return the saved records; states stay compressed until restored."""
+        try:
+            with open(self.path, "rb") as f:
+                data = f.read()
+            if data.startswith(self.MAGIC):
+                return marshal.loads(data[len(self.MAGIC):])
+        except (OSError, ValueError, EOFError, TypeError):
+            pass
+        return []
+
+    def clear(self):
+        try:
+            os.remove(self.path)
+        except OSError:
+            pass
+
+
+def _text_changed(text):
+    """True if a Text widget was edited since the last call."""
+    modified = text.edit_modified()
+    text.edit_modified(False)
+    return bool(modified)
+
+
+class DiskAnalyzer:
+    """Finds duplicate files and the biggest files/directories under a path.
+
+    Duplicates go through stages so most files are never read in full:
+    same size, then same hash of the first and last block, then same full
+    hash. Hashing runs in a thread pool (hashlib releases the GIL) and
+    digests are cached in app_data/ by (device, inode, mtime, size).
+    Results are pushed to `events` as they are found:
+      ("progress", stage, done, total), ("largest", files, dirs),
+      ("dup", size, paths), ("done", message)
+    Hard links are counted once. The cache only keeps the files of the last
+    complete scan.
+    """
+
+    BLOCK = 64 * 1024
+    CHUNK = 8 * 1024 * 1024
+    TOP = 100
+
+    def __init__(self, path, workers=None, cache_path=HASH_CACHE_PATH):
+        self.path = path
+        self.workers = workers or min(32, (os.cpu_count() or 1) * 4)
+        self.cache_path = cache_path
+        self.events = queue.Queue()
+        self.stop = threading.Event()
+        self._cache = {}
+        self._seen = set()  # cache keys of this scan
+
+    def start(self):
+        threading.Thread(target=self._run, daemon=True).start()
+
+    def _run(self):
+        try:
+            self._load_cache()
+            files = self._scan()
+            if not self.stop.is_set():
+                self._find_duplicates(files)
+            self._save_cache()
+            self.events.put(("done", "Analyse interrompue" if self.stop.is_set() else "Analyse terminee"))
+        except Exception as e:
+            self.events.put(("done", f"Erreur: {e}"))
+
+    # Scan
+
+    def _scan(self):
+        """Walk the tree once: sizes for the duplicate stage, largest files and dirs."""
+        files = []  # (size, path, key)
+        dir_sizes = {}
+        largest = []
+        inodes = set()  # (st_dev, st_ino): other hard links are skipped
+        stack = [self.path]
+        count = 0
+        while stack and not self.stop.is_set():
+            top = stack.pop()
+            total = 0
+            try:
+                with os.scandir(top) as it:
+                    for entry in it:
+                        try:
+                            if entry.is_dir(follow_symlinks=False):
+                                stack.append(entry.path)
+                            elif entry.is_file(follow_symlinks=False):
+                                st = entry.stat(follow_symlinks=False)
+                                if st.st_nlink > 1:
+                                    if (st.st_dev, st.st_ino) in inodes:
+                                        continue
+                                    inodes.add((st.st_dev, st.st_ino))
+                                total += st.st_size
+                                key = (st.st_dev, st.st_ino, st.st_mtime_ns, st.st_size)
+                                self._seen.add(key)
+                                files.append((st.st_size, entry.path, key))
+                                if len(largest) < self.TOP:
+                                    heapq.heappush(largest, (st.st_size, entry.path))
+                                elif st.st_size > largest[0][0]:
+                                    heapq.heapreplace(largest, (st.st_size, entry.path))
+                        except OSError:
+                            continue
+            except OSError:
+                continue
+            dir_sizes[top] = total
+            count += 1
+            if count % 500 == 0:
+                self.events.put(("progress", "scan", len(files), 0))
+        # Directory totals include their sub-directories
+        for d in sorted(dir_sizes, key=len, reverse=True):
+            parent = os.path.dirname(d)
+            if d != self.path and parent in dir_sizes:
+                dir_sizes[parent] += dir_sizes[d]
+        top_dirs = heapq.nlargest(self.TOP, ((size, d) for d, size in dir_sizes.items() if d != self.path))
+        self.events.put(("largest", sorted(largest, reverse=True), top_dirs))
+        return files
+
+    # Duplicates
+
+    def _find_duplicates(self, files):
+        by_size = {}
+        for size, path, key in files:
+            if size > 0:
+                by_size.setdefault(size, []).append((path, key))
+        candidates = [group for group in by_size.values() if len(group) > 1]
+
+        with ThreadPoolExecutor(self.workers) as pool:
+            # Stage 2: first and last block
+            groups = self._regroup(pool, candidates, "partial", 0)
+            # Stage 3: full hash, only needed when the blocks did not cover the file
+            big = []
+            for group in groups:
+                if group[0][1][3] <= 2 * self.BLOCK:
+                    self._report(group)
+                else:
+                    big.append(group)
+            self._regroup(pool, big, "full", 1, report=True)
+
+    def _regroup(self, pool, groups, stage, slot, report=False):
+        """Split each group by digest; return the groups still holding duplicates."""
+        total = sum(len(g) for g in groups)
+        done = 0
+        result = []
+        jobs = [(group, [pool.submit(self._digest, path, key, slot) for path, key in group]) for group in groups]
+        for group, futures in jobs:
+            if self.stop.is_set():
+                for _, fs in jobs:
+                    for f in fs:
+                        f.cancel()
+                break
+            by_digest = {}
+            for (path, key), future in zip(group, futures):
+                digest = future.result()
+                if digest is not None:
+                    by_digest.setdefault(digest, []).append((path, key))
+            for same in by_digest.values():
+                if len(same) > 1:
+                    result.append(same)
+                    if report:
+                        self._report(same)
+            done += len(group)
+            self.events.put(("progress", stage, done, total))
+        return result
+
+    def _report(self, group):
+        self.events.put(("dup", group[0][1][3], [path for path, key in group]))
+
+    def _digest(self, path, key, slot):
+        if self.stop.is_set():
+            return None
+        cached = self._cache.get(key)
+        if cached and cached[slot]:
+            return cached[slot]
+        try:
+            digest = self._hash_ends(path, key[3]) if slot == 0 else self._hash_full(path)
+        except OSError:
+            return None
+        entry = self._cache.setdefault(key, [None, None])
+        entry[slot] = digest
+        return digest
+
+    def _hash_ends(self, path, size):
+        h = hashlib.blake2b(digest_size=16)
+        with open(path, "rb") as f:
+            h.update(f.read(self.BLOCK))
+            if size > self.BLOCK:
+                f.seek(max(self.BLOCK, size - self.BLOCK))
+                h.update(f.read(self.BLOCK))
+        return h.digest()
+
+    def _hash_full(self, path):
+        h = hashlib.blake2b(digest_size=32)
+        with open(path, "rb") as f:
+            try:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    view = memoryview(mm)
+                    for i in range(0, len(mm), self.CHUNK):
+                        if self.stop.is_set():
+                            view.release()
+                            return None
+                        h.update(view[i:i + self.CHUNK])
+                    view.release()
+            except (ValueError, OSError):
+                # mmap not possible (special file, 32-bit...): large buffered reads
+                f.seek(0)
+                h = hashlib.blake2b(digest_size=32)
+                for chunk in iter(lambda: f.read(self.CHUNK), b""):
+                    h.update(chunk)
+        return h.digest()
+
+    # Cache
+
+    def _load_cache(self):
+        try:
+            with open(self.cache_path, "rb") as f:
+                self._cache = {key: list(value) for key, value in marshal.load(f).items()}
+        except (OSError, ValueError, EOFError, TypeError):
+            self._cache = {}
+
+    def _save_cache(self):
+        if not self.stop.is_set():
+            # Files deleted or changed since their digest was computed
+            self._cache = {key: value for key, value in self._cache.items() if key in self._seen}
+        try:
+            os.makedirs(os.path.dirname(self.cache_path), exist_ok=True)
+            tmp = self.cache_path + ".tmp"
+            with open(tmp, "wb") as f:
+                marshal.dump({key: tuple(value) for key, value in self._cache.items()}, f)
+            os.replace(tmp, self.cache_path)
+        except OSError as e:
+            print(f"Hash cache error: {e}")
+
+
+def format_size(size):
+    for unit in ("B", "KB", "MB", "GB"):
+        if size < 1024:
+            return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} TB"
+
+
+class TransferStopped(Exception):
+    """Raised inside a copy when its job is paused or cancelled."""
+
+
+class TransferQueue:
+    """Background copy/move jobs, saved to app_data/transfers.json.
+
+    Data is copied in the kernel with os.copy_file_range or os.sendfile
+    when available, with large buffered reads otherwise. Files are written
+    to "<name>.part" and renamed when complete, so a paused, cancelled or
+    interrupted job resumes where it stopped; each job keeps the list of
+    files it finished. Existing destinations are never overwritten. Small
+    files of a job are copied in parallel. Moves on the same filesystem are
+    a single rename, other moves remove a source file only once all of it
+    is at the destination.
+    """
+
+    CHUNK = 64 * 1024 * 1024  # per copy_file_range / sendfile call
+    BUFFER = 8 * 1024 * 1024  # fallback read size
+    SMALL = 1024 * 1024  # files below this are copied in parallel
+    SAVE_EVERY = 1.0  # s
+
+    def __init__(self, path=TRANSFERS_PATH, workers=8):
+        self.path = path
+        self.workers = workers
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._last_save = 0
+        self.jobs = self._load()
+        for job in self.jobs:
+            if job["state"] in ("running", "finishing"):  # interrupted by a shutdown
+                job["state"] = "queued"
+        threading.Thread(target=self._run, daemon=True).start()
+
+    # Public API (Tk thread)
+
+    def add(self, op, src, dst):
+        with self._lock:
+            job = {
+                "id": max([j["id"] for j in self.jobs], default=0) + 1,
+                "op": op, "src": src, "dst": dst, "state": "queued",
+                "done_bytes": 0, "total_bytes": 0, "error": "",
+                "started": False, "completed": [],
+            }
+            self.jobs.append(job)
+        self.save()
+        self._wake.set()
+        return job
+
+    def pause(self, job_id):
+        self._set_state(job_id, "paused", ("queued", "running"))
+
+    def resume(self, job_id):
+        self._set_state(job_id, "queued", ("paused", "failed"))
+        self._wake.set()
+
+    def cancel(self, job_id):
+        self._set_state(job_id, "cancelled", ("queued", "running", "paused", "failed"))
+
+    def clear_finished(self):
+        with self._lock:
+            self.jobs = [j for j in self.jobs if j["state"] not in ("done", "cancelled")]
+        self.save()
+
+    def _set_state(self, job_id, state, allowed):
+        with self._lock:
+            for job in self.jobs:
+                if job["id"] == job_id and job["state"] in allowed:
+                    job["state"] = state
+        self.save()
+
+    # Persistence
+
+    def _load(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return []
+
+    def save(self):
+        with self._lock:
+            self._save()
+
+    def _save(self):
+        """Write the jobs to disk; the caller holds the lock."""
+        data = json.dumps(self.jobs, indent=1)
+        self._last_save = time.monotonic()
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            tmp = self.path + ".tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                f.write(data)
+            os.replace(tmp, self.path)
+        except OSError as e:
+            print(f"Transfers error: {e}")
+
+    # Worker
+
+    def _run(self):
+        while True:
+            with self._lock:
+                job = next((j for j in self.jobs if j["state"] == "queued"), None)
+                if job:
+                    job["state"] = "running"
+            if job is None:
+                self._wake.wait(1)
+                self._wake.clear()
+                continue
+            try:
+                self._run_job(job)
+                with self._lock:
+                    if job["state"] == "finishing":
+                        job["state"] = "done"
+            except TransferStopped:
+                if job["state"] == "cancelled":
+                    self._discard_parts(job)
+            except OSError as e:
+                job["state"] = "failed"
+                job["error"] = str(e)
+            self.save()
+
+    def _check(self, job):
+        if job["state"] != "running":
+            raise TransferStopped()
+
+    def _add(self, job, n, completed=None):
+        with self._lock:
+            job["done_bytes"] += n
+            if completed:
+                job["completed"].append(completed)
+            if time.monotonic() - self._last_save > self.SAVE_EVERY:
+                self._save()
+
+    def _run_job(self, job):
+        src, dst = job["src"], job["dst"]
+        if not job.get("started"):
+            if os.path.lexists(dst):
+                raise FileExistsError(errno.EEXIST, "Destination exists", dst)
+            if job["op"] == "move":
+                try:
+                    os.rename(src, dst)  # atomic on the same filesystem
+                    with self._lock:
+                        job["state"] = "finishing"  # complete: a late pause/cancel changes nothing
+                    return
+                except OSError as e:
+                    if e.errno != errno.EXDEV:
+                        raise
+            job["started"] = True
+            job["completed"] = []
+            self.save()
+        plan = self._plan(src, dst)
+        done = set(job["completed"])  # finished by an earlier run
+        todo = [p for p in plan if p[1] not in done]
+        with self._lock:
+            job["total_bytes"] = sum(size for _, _, size in plan)
+            job["done_bytes"] = job["total_bytes"] - sum(size for _, _, size in todo)
+        small = [p for p in todo if p[2] < self.SMALL]
+        large = [p for p in todo if p[2] >= self.SMALL]
+        with ThreadPoolExecutor(self.workers) as pool:
+            for future in [pool.submit(self._copy_file, job, *p) for p in small]:
+                future.result()
+        # Big files one at a time: parallel streams only make the disk seek
+        for p in large:
+            self._copy_file(job, *p)
+        with self._lock:
+            self._check(job)
+            job["state"] = "finishing"  # everything copied: too late to pause or cancel
+        if job["op"] == "move":
+            # Only what was copied: files that appeared since stay in place
+            for p, _, _ in plan:
+                if os.path.lexists(p):  # may be gone if a restart interrupted this step
+                    os.remove(p)
+            if os.path.isdir(src) and not os.path.islink(src):
+                for top, dirs, files in os.walk(src, topdown=False):
+                    try:
+                        os.rmdir(top)
+                    except OSError:
+                        pass
+
+    def _plan(self, src, dst):
+        """Create the destination directories; return (src, dst, size) per file."""
+        if not os.path.isdir(src) or os.path.islink(src):
+            return [(src, dst, os.path.getsize(src))]
+        plan = []
+        for top, dirs, files in os.walk(src):
+            target = os.path.normpath(os.path.join(dst, os.path.relpath(top, src)))
+            os.makedirs(target, exist_ok=True)
+            for name in files:
+                p = os.path.join(top, name)
+                plan.append((p, os.path.join(target, name), os.path.getsize(p) if not os.path.islink(p) else 0))
+        return plan
+
+    def _copy_file(self, job, src, dst, size):
+        self._check(job)
+        if os.path.lexists(dst):
+            raise FileExistsError(errno.EEXIST, "Destination exists", dst)
+        if os.path.islink(src):
+            os.symlink(os.readlink(src), dst)
+            self._add(job, 0, dst)
+            return
+        part = dst + ".part"
+        offset = os.path.getsize(part) if os.path.exists(part) else 0
+        if offset > size:
+            offset = 0
+        with open(src, "rb", buffering=0) as fin, open(part, "r+b" if offset else "wb", buffering=0) as fout:
+            self._add(job, offset)
+            fast = True
+            buf = None
+            while offset < size:
+                self._check(job)
+                count = min(self.CHUNK, size - offset)
+                n = 0
+                if fast:
+                    try:
+                        n = self._copy_range(fin, fout, offset, count)
+                    except OSError:
+                        fast = False  # not supported here (old kernel, other FS...)
+                if not fast:
+                    if buf is None:
+                        buf = memoryview(bytearray(self.BUFFER))
+                    fin.seek(offset)
+                    fout.seek(offset)
+                    n = fin.readinto(buf[:min(self.BUFFER, count)])
+                    fout.write(buf[:n])
+                if not n:
+                    raise OSError(errno.EIO, "Source changed while copying", src)
+                offset += n
+                self._add(job, n)
+        shutil.copystat(src, part)
+        os.replace(part, dst)
+        self._add(job, 0, dst)
+
+    def _copy_range(self, fin, fout, offset, count):
+        if hasattr(os, "copy_file_range"):
+            return os.copy_file_range(fin.fileno(), fout.fileno(), count, offset, offset)
+        if hasattr(os, "sendfile") and sys.platform.startswith("linux"):
+            fout.seek(offset)
+            return os.sendfile(fout.fileno(), fin.fileno(), offset, count)
+        raise OSError(errno.ENOSYS, "no zero-copy primitive")
+
+    def _discard_parts(self, job):
+        dst = job["dst"]
+        paths = [dst + ".part"]
+        if os.path.isdir(dst):
+            for top, dirs, files in os.walk(dst):
+                paths += [os.path.join(top, f) for f in files if f.endswith(".part")]
+        for p in paths:
+            try:
+                os.remove(p)
+            except OSError:
+                pass
+
+
+class MemoryMonitor:
+    """Per-app memory accounting and leak reports.
+
+    Python allocations are traced with tracemalloc and charged to an app
+    when their traceback goes through that app's method in this file
+    (closures such as load_dir included). When the first window of an app
+    opens, the app's live allocations are recorded; when its last window
+    closes, what it holds beyond that baseline is reported as a possible
+    leak. Snapshots are taken on one worker thread, in order, and only the
+    app's statistics are kept. Tk widget, Treeview item and image counts
+    are gathered per window. Tracing costs memory and CPU, so it only runs
+    when enabled.
+    """
+
+    NFRAMES = 16
+    LEAK_DELAY = 1000  # ms after a close, so Tk and the GC free what they will
+
+    def __init__(self, root, dump_interval=0):
+        self.root = root
+        self.windows = {}  # win -> (app, opened_at)
+        self.leaks = []  # (app, closed_at, bytes, [(line, bytes)])
+        self._baselines = {}  # app -> {traceback: bytes}, worker thread only
+        self._worker = ThreadPoolExecutor(1)
+        self._ranges = None
+        self._files = {}
+        if dump_interval:
+            self._dump_every(dump_interval * 1000)
+
+    @property
+    def tracing(self):
+        return tracemalloc.is_tracing()
+
+    def start(self):
+        if not self.tracing:
+            tracemalloc.start(self.NFRAMES)
+
+    def stop(self):
+        tracemalloc.stop()
+        self._worker.submit(self._baselines.clear)
+
+    def _is_open(self, app):
+        return any(a == app for a, opened in self.windows.values())
+
+    def track(self, win, app):
+        if self.tracing and not self._is_open(app):
+            self._worker.submit(self._baseline, app)
+        self.windows[win] = (app, time.time())
+        win.bind("<Destroy>", lambda e: e.widget is win and self._closed(win), add="+")
+
+    def _closed(self, win):
+        app, opened = self.windows.pop(win, (None, 0))
+        if app and self.tracing and not self._is_open(app):
+            def report():
+                if not self._is_open(app):  # reopened meanwhile: wait for its last close
+                    gc.collect()
+                    self._worker.submit(self._leak_report, app)
+            self.root.after(self.LEAK_DELAY, report)
+
+    # Attribution
+
+    def _app_of(self, traceback):
+        """(app, line) of the first frame of `traceback` inside an UltraOS app."""
+        if self._ranges is None:
+            # Built aside and assigned once: other threads may call this meanwhile
+            ranges = []
+            for name in dir(UltraOS):
+                if name.startswith("open_"):
+                    lines, start = inspect.getsourcelines(getattr(UltraOS, name))
+                    ranges.append((start, start + len(lines) - 1, name))
+            self._ranges = ranges
+        for frame in traceback:
+            if frame.filename not in self._files:
+                self._files[frame.filename] = os.path.abspath(frame.filename) == os.path.abspath(__file__)
+            if self._files[frame.filename]:
+                for start, end, name in self._ranges:
+                    if start <= frame.lineno <= end:
+                        return name, frame.lineno
+        return None, None
+
+    def traced_by_app(self):
+        """Bytes currently allocated per app (slow on big heaps: call from a thread)."""
+        sizes = Counter()
+        if self.tracing:
+            for stat in tracemalloc.take_snapshot().statistics("traceback"):
+                app, line = self._app_of(stat.traceback)
+                if app:
+                    sizes[app] += stat.size
+        return sizes
+
+    def _app_stats(self, app):
+        """{traceback: bytes} of the live allocations charged to `app`."""
+        if not self.tracing:
+            return {}
+        return {stat.traceback: stat.size
+                for stat in tracemalloc.take_snapshot().statistics("traceback")
+                if self._app_of(stat.traceback)[0] == app}
+
+    def _baseline(self, app):
+        if app not in self._baselines:
+            self._baselines[app] = self._app_stats(app)
+
+    def _leak_report(self, app):
+        before = self._baselines.pop(app, None)
+        if before is None or not self.tracing:
+            return
+        total = 0
+        lines = Counter()
+        for traceback, size in self._app_stats(app).items():
+            grown = size - before.get(traceback, 0)
+            if grown > 0:
+                total += grown
+                lines[self._app_of(traceback)[1]] += grown
+        self.leaks.append((app, time.time(), total, lines.most_common(5)))
+        del self.leaks[:-50]
+
+    # Tk side (Tk thread only)
+
+    def widget_counts(self):
+        """{app: [windows, widgets, tree/text items]} for the open windows."""
+        counts = {}
+        for win, (app, opened) in list(self.windows.items()):
+            if not win.winfo_exists():
+                continue
+            row = counts.setdefault(app, [0, 0, 0])
+            row[0] += 1
+            stack = [win]
+            while stack:
+                w = stack.pop()
+                row[1] += 1
+                if w.winfo_class() == "Treeview":
+                    row[2] += len(w.get_children())
+                elif w.winfo_class() == "Text":
+                    row[2] += int(w.index("end-1c").split(".")[0])
+                stack.extend(w.winfo_children())
+        return counts
+
+    def tk_images(self):
+        return len(self.root.tk.call("image", "names"))
+
+    # Dump
+
+    def dump(self, path=MEMORY_LOG_PATH):
+        counts = self.widget_counts()
+        images = self.tk_images()
+        leaks = [leak for leak in self.leaks if leak[1] > time.time() - 3600]
+
+        def write():
+            record = {
+                "time": time.time(),
+                "rss": psutil.Process().memory_info().rss,
+                "tk_images": images,
+                "apps": counts,
+                "traced": dict(self.traced_by_app()),
+                "leaks": leaks,
+            }
+            try:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                with open(path, "a", encoding="utf-8") as f:
+                    f.write(json.dumps(record) + "\n")
+            except OSError as e:
+                print(f"Memory log error: {e}")
+        threading.Thread(target=write, daemon=True).start()
+
+    def _dump_every(self, ms):
+        self.dump()
+        self.root.after(ms, lambda: self._dump_every(ms))
+
+
+class PieceTable:
+    """Text document stored as pieces of two buffers (bytes).
+
+    The original file is memory-mapped and never copied (read on Windows,
+    where a mapped file cannot be replaced when saving); typed text is
+    appended to an add buffer. An edit only rewrites the piece list, so
+    memory grows with the edits, not with the file. Undo records keep the
+    replaced pieces (not the text), and consecutive keystrokes are merged
+    into one undo group.
+    """
+
+    GROUP_DELAY = 2.0  # s between keystrokes still merged in one undo group
+    WRITE_CHUNK = 1024 * 1024
+
+    def __init__(self, path=None):
+        self.path = path
+        self._file = None
+        original = b""
+        if path and os.name == "nt":
+            with open(path, "rb") as f:
+                original = f.read()
+        elif path:
+            self._file = open(path, "rb")
+            if os.fstat(self._file.fileno()).st_size:
+                try:
+                    original = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+                except (ValueError, OSError):
+                    original = self._file.read()
+        self.buffers = [original, bytearray()]
+        self.pieces = [(0, 0, len(original))] if len(original) else []  # (buffer, start, length)
+        self.length = len(original)
+        self.undo_stack = []
+        self.redo_stack = []
+        self.modified = False
+        self._last = None  # (kind, position, time) of the last keystroke
+
+    def close(self):
+        if isinstance(self.buffers[0], mmap.mmap):
+            self.buffers[0].close()
+        if self._file:
+            self._file.close()
+
+    # Reading
+
+    def get(self, start=0, end=None):
+        end = self.length if end is None else min(end, self.length)
+        out = []
+        pos = 0
+        for buf, first, n in self.pieces:
+            if pos >= end:
+                break
+            if pos + n > start:
+                lo, hi = max(start - pos, 0), min(end - pos, n)
+                out.append(self.buffers[buf][first + lo:first + hi])
+            pos += n
+        return b"".join(out)
+
+    def write_to(self, f):
+        """Stream the document into a binary file object."""
+        for buf, first, n in self.pieces:
+            with memoryview(self.buffers[buf]) as view:
+                for i in range(first, first + n, self.WRITE_CHUNK):
+                    f.write(view[i:min(i + self.WRITE_CHUNK, first + n)])
+
+    # Editing
+
+    def insert(self, pos, data):
+        if not data:
+            return
+        add = self.buffers[1]
+        start = len(add)
+        add += data
+        self._record(self._splice(pos, 0, [(1, start, len(data))]), "insert", pos, len(data), data)
+
+    def delete(self, pos, n):
+        n = min(n, self.length - pos)
+        if n > 0:
+            self._record(self._splice(pos, n, []), "delete", pos, n, None)
+
+    def _locate(self, pos):
+        """(piece index, offset in piece) of byte `pos`."""
+        at = 0
+        for i, (buf, first, n) in enumerate(self.pieces):
+            if pos < at + n:
+                return i, pos - at
+            at += n
+        return len(self.pieces), 0
+
+    def _splice(self, pos, n, new):
+        i, off = self._locate(pos)
+        j, off2 = self._locate(pos + n)
+        left, right = [], []
+        if off:
+            buf, first, length = self.pieces[i]
+            left = [(buf, first, off)]
+        elif i > 0:
+            i -= 1  # take the previous piece along so typing extends it
+            left = [self.pieces[i]]
+        end = j
+        if off2:
+            buf, first, length = self.pieces[j]
+            right = [(buf, first + off2, length - off2)]
+            end = j + 1
+        replacement = []
+        for piece in left + new + right:
+            if replacement and replacement[-1][0] == piece[0] and sum(replacement[-1][1:]) == piece[1]:
+                replacement[-1] = (piece[0], replacement[-1][1], replacement[-1][2] + piece[2])
+            elif piece[2]:
+                replacement.append(piece)
+        old = self.pieces[i:end]
+        self.pieces[i:end] = replacement
+        self.length += sum(p[2] for p in new) - n
+        return (i, old, replacement, pos, n, sum(p[2] for p in new))
+
+    def _record(self, record, kind, pos, n, data):
+        now = time.monotonic()
+        keystroke = (kind == "delete" and n <= 4) or (kind == "insert" and n <= 4 and b"\n" not in data)
+        last = self._last
+        merge = (
+            keystroke and last and last[0] == kind and now - last[2] < self.GROUP_DELAY
+            and (pos == last[1] or (kind == "delete" and pos + n == last[1]))
+        )
+        if merge:
+            self.undo_stack[-1].append(record)
+        else:
+            self.undo_stack.append([record])
+        self.redo_stack.clear()
+        self._last = (kind, pos + n if kind == "insert" else pos, now) if keystroke else None
+        self.modified = True
+
+    def undo(self):
+        """Revert the last group; return its changes as (pos, removed bytes, inserted data)."""
+        if not self.undo_stack:
+            return []
+        group = self.undo_stack.pop()
+        changes = []
+        for i, old, new, pos, removed, inserted in reversed(group):
+            self.pieces[i:i + len(new)] = old
+            self.length += removed - inserted
+            changes.append((pos, inserted, self.get(pos, pos + removed)))
+        self.redo_stack.append(group)
+        self._last = None
+        self.modified = True
+        return changes
+
+    def redo(self):
+        if not self.redo_stack:
+            return []
+        group = self.redo_stack.pop()
+        changes = []
+        for i, old, new, pos, removed, inserted in group:
+            self.pieces[i:i + len(old)] = new
+            self.length += inserted - removed
+            changes.append((pos, removed, self.get(pos, pos + inserted)))
+        self.undo_stack.append(group)
+        self._last = None
+        self.modified = True
+        return changes
+
+
 class UltraOS:
     def __init__(self, mode="normal"):
         self.root = ctk.CTk()
         self.root.title(f"UltraOS v2.023 - {mode.capitalize()}")
         self.root.geometry("1020x780")
         self.mode = mode
+        self.profile = load_profile(mode)
         self.current_user = os.getenv("USER") or "user"
         self.start_menu_visible = False
+        # App-host mode: one process per app (see AppHost)
+        self.isolate_apps = self.profile["app_host"] or os.getenv("ULTRAOS_APP_HOST") == "1"
+        self.app_host = None
+        self.host_conn = None  # set in app-host workers
+        self.transfers = None
         
         self._setup_ui()
         self._start_clock()
+        self.root.after(1000, self._prewarm)
+
+        self.session = SessionStore(self.root)
+        self.memory = MemoryMonitor(self.root, self.profile["memory_dump_interval"])
+        if self.profile["memory_tracing"]:
+            self.memory.start()
+        self.root.after(500, self._offer_restore)
+        if os.path.exists(TRANSFERS_PATH):
+            self.root.after(1500, self.get_transfers)  # resume unfinished jobs
+        if self.profile["disk_tool"]:
+            self.root.after(700, lambda: self.open_disk_tool(os.path.expanduser("~")))
     
     def _setup_ui(self):
         self.main = ctk.CTkFrame(self.root, fg_color=COLORS["bg"])
@@ -103,14 +1444,11 @@ class UltraOS:
 
         self.canvas = tk.Canvas(self.main, bg=COLORS["bg"], highlightthickness=0)
         self.canvas.pack(fill="both", expand=True)
-        threading.Thread(target=self._load_wallpaper, daemon=True).start()
+        self.desktop = DesktopCompositor(self.canvas)
+        if self.profile["wallpaper"] != "none":
+            threading.Thread(target=self._load_wallpaper, daemon=True).start()
 
-        self.title_label = ctk.CTkLabel(
-            self.canvas, text="UltraOS", 
-            font=("Inter", 64, "bold"),
-            text_color=COLORS["accent"]
-        )
-        self.title_label.place(relx=0.5, rely=0.1, anchor="center")
+        self.title_label = self.desktop.add_title("UltraOS")
 
         self._create_desktop_icons()
 
@@ -121,14 +1459,21 @@ class UltraOS:
     def _load_wallpaper(self):
         """Chargement du wallpaper"""
         try:
-            wall = create_wallpaper(1920, 1080)
-            # Convert to PhotoImage
-            import io
-            bio = io.BytesIO()
-            wall.save(bio, format='PNG')
-            bio.seek(0)
-            self.wallpaper = tk.PhotoImage(data=bio.read())
-            self.canvas.create_image(0, 0, image=self.wallpaper, anchor="nw")
+            data = None
+            if self.profile["wallpaper"] == "cached" and os.path.exists(WALLPAPER_CACHE):
+                with open(WALLPAPER_CACHE, "rb") as f:
+                    data = f.read()
+            if data is None:
+                wall = create_wallpaper(1920, 1080)
+                # Convert to PNG here, the PhotoImage is built on the Tk thread
+                bio = io.BytesIO()
+                wall.save(bio, format='PNG')
+                data = bio.getvalue()
+                if self.profile["wallpaper"] == "cached":
+                    os.makedirs(APP_DATA, exist_ok=True)
+                    with open(WALLPAPER_CACHE, "wb") as f:
+                        f.write(data)
+            self.root.after(0, lambda: self.desktop.set_wallpaper(tk.PhotoImage(data=data)))
         except Exception as e:
             print(f"Wallpaper error: {e}")
     
@@ -144,14 +1489,18 @@ class UltraOS:
         
         for i, (text, cmd) in enumerate(icons_data):
             x, y = 50 + (i // 3) * 150, 200 + (i % 3) * 100
-            btn = ctk.CTkButton(
-                self.canvas, text=text, command=cmd,
-                width=120, height=70,
-                fg_color=COLORS["surface"],
-                hover_color=COLORS["accent"],
-                font=("Inter", 12, "bold")
-            )
-            self.canvas.create_window(x, y, window=btn)
+            self.desktop.add_icon(text, lambda c=cmd: self.launch(c), x, y)
+
+        # Fichiers du bureau de l'utilisateur
+        desktop_dir = os.path.join(os.path.expanduser("~"), "Desktop")
+        if self.profile["desktop_files"] and os.path.isdir(desktop_dir):
+            self.root.after(100, lambda: self.desktop.load_folder(desktop_dir, self._open_desktop_item))
+
+    def _open_desktop_item(self, path):
+        if os.path.isdir(path):
+            self.open_file_manager(path)
+        else:
+            webbrowser.open(Path(path).as_uri())
     
     def _create_taskbar(self):
         self.taskbar = ctk.CTkFrame(self.root, height=50, fg_color=COLORS["surface"])
@@ -186,13 +1535,16 @@ class UltraOS:
             ("📊 Taches", self.open_task_manager),
             ("🌐 Web", self.open_browser),
             ("⚙️ Paramètres", self.open_settings),
-            ("🚪 Eteindre", self.root.quit),
+            ("🚪 Eteindre", self.shutdown),
         ]
+        if self.profile["disk_tool"]:
+            items.insert(-1, ("🧹 Disque", self.open_disk_tool))
+            self.start_menu.geometry("250x400")
         
         for name, action in items:
             btn = ctk.CTkButton(
                 self.start_menu, text=name,
-                command=lambda a=action: [self.start_menu.withdraw(), a()],
+                command=lambda a=action: [self.start_menu.withdraw(), self.launch(a)],
                 fg_color="transparent", hover_color=COLORS["accent"],
                 anchor="w", height=40
             )
@@ -207,16 +1559,113 @@ class UltraOS:
             self.start_menu.geometry(f"+{x}+{y}")
             self.start_menu.deiconify()
     
+    def launch(self, app):
+        """Open an app, in its own process when app-host mode is on."""
+        if app.__name__ == "open_browser" and not self.profile["qt"]:
+            app()  # only tells that the browser is disabled in this mode
+        elif self.isolate_apps and app.__name__ in HOSTED_APPS:
+            self.get_app_host().launch(app.__name__)
+        else:
+            app()
+
+    def get_app_host(self):
+        if self.app_host is None:
+            spares = max(1, len(self.profile["prewarm"]))
+            self.app_host = AppHost(self.root, self.current_user, self.mode, spares, self._host_request)
+        return self.app_host
+
+    def _host_request(self, msg):
+        """Requests of hosted apps that the shell process serves."""
+        if msg.get("op") == "transfer":
+            self.queue_transfer(*msg["args"])
+        elif msg.get("op") == "transfers":
+            self.open_transfers()
+
+    def shutdown(self):
+        if self.app_host:
+            self.app_host.shutdown_all()
+        self.session.save()
+        self.root.quit()
+
+    def get_transfers(self):
+        if self.transfers is None:
+            self.transfers = TransferQueue()
+        return self.transfers
+
+    def queue_transfer(self, op, src, dst):
+        """Copy/move `src` into `dst` (a directory, or the new path).
+
+        In an app-host worker the job is sent to the shell's queue and None
+        is returned.
+        """
+        src = os.path.abspath(src)
+        if os.path.isdir(dst):
+            dst = os.path.join(dst, os.path.basename(src))
+        dst = os.path.abspath(dst)
+        if self.host_conn is not None:
+            self.host_conn.send({"op": "transfer", "args": [op, src, dst]})
+            return None
+        return self.get_transfers().add(op, src, dst)
+
+    # Session
+
+    def _track(self, win, app, capture=dict, changed=None):
+        if getattr(self, "session", None):
+            self.session.track(win, app, capture, changed)
+        if getattr(self, "memory", None):
+            self.memory.track(win, app)
+
+    def _offer_restore(self):
+        records = [r for r in self.session.load() if r[0] in HOSTED_APPS]
+        if not records:
+            return
+        if not messagebox.askyesno("Session", f"Restaurer les {len(records)} fenetre(s) de la derniere session ?"):
+            self.session.clear()
+            return
+        # One window per tick: the desktop stays usable while they come back
+        def restore(i=0):
+            if i < len(records):
+                app, geometry, blob = records[i]
+                try:
+                    win = getattr(self, app)(state=marshal.loads(zlib.decompress(blob)))
+                    if win is not None and geometry:
+                        win.geometry(geometry)
+                except Exception as e:
+                    print(f"Session restore error ({app}): {e}")
+                self.root.after(50, lambda: restore(i + 1))
+        restore()
+    
+    def _prewarm(self):
+        """Import what the profile's apps need, off the Tk thread."""
+        def load():
+            for app in self.profile["prewarm"]:
+                if app == "open_browser" and not self.profile["qt"]:
+                    continue
+                for module in PREWARM_MODULES.get(app, []):
+                    try:
+                        __import__(module)
+                    except ImportError:
+                        pass
+            if "open_task_manager" in self.profile["prewarm"]:
+                # First cpu_percent() call of each process always returns 0.0
+                for proc in psutil.process_iter(['cpu_percent']):
+                    pass
+        if self.isolate_apps and self.profile["prewarm"]:
+            self.get_app_host()
+        threading.Thread(target=load, daemon=True).start()
+
     def _start_clock(self):
+        interval = self.profile["clock_interval"]
+        fmt = "%H:%M:%S" if interval <= 1 else "%H:%M"  # seconds would show stale
+
         def update():
-            while True:
-                self.clock.configure(text=datetime.now().strftime("%H:%M:%S"))
-                time.sleep(1)
-        threading.Thread(target=update, daemon=True).start()
+            self.clock.configure(text=datetime.now().strftime(fmt))
+            self.root.after(int(interval * 1000), update)
+        update()
     
     # Applications
     
-    def open_terminal(self):
+    def open_terminal(self, state=None):
         win = ctk.CTkToplevel(self.root)
         win.title("Terminal")
         win.geometry("900x600")
@@ -229,8 +1678,23 @@ class UltraOS:
             font=("Consolas", 11), insertbackground="#00ff00"
         )
         text.pack(fill="both", expand=True)
-        text.insert("end", f"UltraOS Terminal v2.023\n{self.current_user}@ultraos:~$ ")
+        if state:
+            text.insert("end", state["scrollback"])
+        else:
+            text.insert("end", f"UltraOS Terminal v2.023\n{self.current_user}@ultraos:~$ ")
+        self._track(win, "open_terminal", lambda: {"scrollback": text.get("1.0", "end-1c")},
+                    lambda: _text_changed(text))
         
+        def is_plain_transfer(cmd):
+            """Only "cp SRC DST" / "mv SRC DST"; options, globs etc. go to the shell."""
+            if any(c in cmd for c in "*?[]$~;&|<>`"):
+                return False
+            try:
+                args = shlex.split(cmd)
+            except ValueError:
+                return False
+            return len(args) == 3 and not any(a.startswith("-") for a in args[1:])
+
         def execute(event):
             cmd = text.get("end-2l linestart", "end-1c").split("$")[-1].strip()
             if cmd:
@@ -239,7 +1703,7 @@ class UltraOS:
                     if cmd == "clear":
                         text.delete("1.0", "end")
                     elif cmd == "help":
-                        text.insert("end", "Commands: ls, pwd, whoami, date, clear, exit\n")
+                        text.insert("end", "Commands: ls, pwd, whoami, date, cp, mv, clear, exit\n")
                     elif cmd == "ls":
                         text.insert("end", "\n".join(os.listdir()) + "\n")
                     elif cmd == "pwd":
@@ -251,22 +1715,32 @@ class UltraOS:
                     elif cmd == "exit":
                         win.destroy()
                         return
+                    elif cmd.split()[0] in ("cp", "mv") and is_plain_transfer(cmd):
+                        # Runs in the transfer queue, not in a blocking subprocess
+                        args = shlex.split(cmd)
+                        job = self.queue_transfer("copy" if args[0] == "cp" else "move", args[1], args[2])
+                        text.insert("end", f"Transfert #{job['id']} en file d'attente\n" if job else "Transfert en file d'attente\n")
                     else:
                         result = subprocess.run(cmd, shell=True, capture_output=True, text=True, timeout=5)
                         text.insert("end", result.stdout or result.stderr or "Command executed\n")
                 except Exception as e:
                     text.insert("end", f"Error: {e}\n")
                 text.insert("end", f"{self.current_user}@ultraos:~$ ")
+                # Keep only the last lines of the profile's scrollback
+                excess = int(text.index("end-1c").split(".")[0]) - self.profile["scrollback"]
+                if excess > 0:
+                    text.delete("1.0", f"{excess + 1}.0")
                 text.see("end")
             return "break"
         
         text.bind("<Return>", execute)
         text.focus()
+        return win
     
     def open_settings(self):
         win = ctk.CTkToplevel(self.root)
         win.title("Settings")
-        win.geometry("500x400")
+        win.geometry("600x700")
         
         frame = ctk.CTkFrame(win)
         frame.pack(fill="both", expand=True, padx=20, pady=20)
@@ -285,7 +1759,88 @@ License: ULTFRee™ (Limited)
 """
         ctk.CTkLabel(frame, text=info_text, justify="left").pack(pady=10)
 
-    def open_file_manager(self):
+        isolate_var = tk.BooleanVar(value=self.isolate_apps)
+        ctk.CTkSwitch(
+            frame, text="Un processus par application",
+            variable=isolate_var,
+            command=lambda: setattr(self, "isolate_apps", isolate_var.get())
+        ).pack(pady=5)
+
+        if self.app_host:
+            for pid, (name, proc, conn) in list(self.app_host.apps.items()):
+                row = ctk.CTkFrame(frame)
+                row.pack(fill="x", pady=2)
+                ctk.CTkLabel(row, text=f"{name[5:]} (PID {pid})").pack(side="left", padx=5)
+                ctk.CTkButton(
+                    row, text="Tuer", width=60,
+                    command=lambda p=pid, r=row: [self.app_host.kill(p), r.destroy()]
+                ).pack(side="right", padx=5)
+                ctk.CTkButton(
+                    row, text="Afficher", width=60,
+                    command=lambda p=pid: self.app_host.focus(p)
+                ).pack(side="right", padx=5)
+
+        # Memoire par application
+        import tkinter.ttk as ttk
+        mem_label = ctk.CTkLabel(frame, text="", anchor="w")
+        mem_label.pack(fill="x", pady=(15, 0))
+        mem_tree = ttk.Treeview(frame, columns=("App", "Windows", "Widgets", "Items", "Traced"), show="headings", height=6)
+        for col in mem_tree["columns"]:
+            mem_tree.heading(col, text=col)
+            mem_tree.column(col, width=90)
+        mem_tree.pack(fill="x", pady=5)
+        leaks_text = tk.Text(frame, height=8, bg=COLORS["surface"], fg=COLORS["text"], font=("Consolas", 9))
+        leaks_text.pack(fill="both", expand=True)
+
+        def refresh_memory():
+            counts = self.memory.widget_counts()
+            mem_label.configure(
+                text=f"RSS: {format_size(psutil.Process().memory_info().rss)} - "
+                     f"images Tk: {self.memory.tk_images()}"
+            )
+
+            def fill(traced):
+                if not mem_tree.winfo_exists():
+                    return
+                mem_tree.delete(*mem_tree.get_children())
+                for app in sorted(set(counts) | set(traced)):
+                    windows, widgets, items = counts.get(app, (0, 0, 0))
+                    mem_tree.insert("", "end", values=(
+                        app[5:], windows, widgets, items,
+                        format_size(traced[app]) if self.memory.tracing else "-"
+                    ))
+                leaks_text.delete("1.0", "end")
+                if not self.memory.tracing:
+                    leaks_text.insert("end", "Activez le suivi memoire pour les rapports de fuite.\n")
+                for app, closed, total, lines in reversed(self.memory.leaks):
+                    when = datetime.fromtimestamp(closed).strftime("%H:%M:%S")
+                    leaks_text.insert("end", f"[{when}] {app[5:]} ferme: {format_size(total)} non liberes\n")
+                    for line, size in lines:
+                        leaks_text.insert("end", f"    app.py:{line}  {format_size(size)}\n")
+
+            # The snapshot can take a while on a big heap: keep it off the Tk thread
+            def measure():
+                traced = self.memory.traced_by_app()
+                self.root.after(0, lambda: fill(traced))
+            threading.Thread(target=measure, daemon=True).start()
+
+        def toggle_tracing():
+            if tracing_var.get():
+                self.memory.start()
+            else:
+                self.memory.stop()
+            refresh_memory()
+
+        tracing_var = tk.BooleanVar(value=self.memory.tracing)
+        mem_buttons = ctk.CTkFrame(frame)
+        mem_buttons.pack(fill="x", pady=5)
+        ctk.CTkSwitch(mem_buttons, text="Suivi memoire (tracemalloc)", variable=tracing_var,
+                      command=toggle_tracing).pack(side="left", padx=5)
+        ctk.CTkButton(mem_buttons, text="⟳", width=50, command=refresh_memory).pack(side="right", padx=5)
+        ctk.CTkButton(mem_buttons, text="Exporter", width=80, command=self.memory.dump).pack(side="right", padx=5)
+        refresh_memory()
+
+    def open_file_manager(self, path=None, state=None):
         win = ctk.CTkToplevel(self.root)
         win.title("File Manager")
         win.geometry("900x650")
@@ -296,7 +1851,7 @@ License: ULTFRee™ (Limited)
         path_frame = ctk.CTkFrame(frame)
         path_frame.pack(fill="x", pady=5)
         
-        path_var = tk.StringVar(value=os.getcwd())
+        path_var = tk.StringVar(value=path or (state or {}).get("path") or os.getcwd())
         path_entry = ctk.CTkEntry(path_frame, textvariable=path_var)
         path_entry.pack(side="left", fill="x", expand=True, padx=5)
         
@@ -323,8 +1878,30 @@ License: ULTFRee™ (Limited)
         
         load_dir()
         ctk.CTkButton(path_frame, text="⟳", width=50, command=load_dir).pack(side="right", padx=5)
+        ctk.CTkButton(
+            path_frame, text="🧹", width=50,
+            command=lambda: self.open_disk_tool(path_var.get())
+        ).pack(side="right", padx=5)
+        
+        def transfer(op):
+            names = [tree.item(i, "values")[0] for i in tree.selection()]
+            if not names:
+                return
+            dst = filedialog.askdirectory(parent=win, title="Destination")
+            if dst:
+                for name in names:
+                    self.queue_transfer(op, os.path.join(path_var.get(), name), dst)
+                self.open_transfers()
+        
+        btn_frame = ctk.CTkFrame(frame)
+        btn_frame.pack(fill="x", pady=5)
+        ctk.CTkButton(btn_frame, text="📋 Copier", command=lambda: transfer("copy")).pack(side="left", padx=5)
+        ctk.CTkButton(btn_frame, text="✂ Deplacer", command=lambda: transfer("move")).pack(side="left", padx=5)
+        ctk.CTkButton(btn_frame, text="⇅ Transferts", command=self.open_transfers).pack(side="right", padx=5)
+        self._track(win, "open_file_manager", lambda: {"path": path_var.get()})
+        return win
     
-    def open_text_editor(self):
+    def open_text_editor(self, state=None):
         win = ctk.CTkToplevel(self.root)
         win.title("Text Editor")
         win.geometry("950x700")
@@ -339,20 +1916,398 @@ License: ULTFRee™ (Limited)
         )
         text.pack(fill="both", expand=True)
         
+        # The document lives in a PieceTable; the Text widget only shows one
+        # page of it (EDITOR_PAGE bytes) and its edits are mirrored into the
+        # table through a proxy on the widget's Tcl command.
+        doc = PieceTable()
+        encoding = "utf-8"  # of the page shown
+        view_start = view_end = 0
+        mirroring = False
+        orig = text._w + "_orig"
+        text.tk.call("rename", text._w, orig)
+        
+        def tk_call(*args):
+            return text.tk.call((orig,) + args)
+        
+        def clamp(index):
+            index = tk_call("index", index)
+            return index if tk_call("compare", index, "<=", "end-1c") else tk_call("index", "end-1c")
+        
+        def offset(index):
+            return view_start + len(tk_call("get", "1.0", index).encode(encoding))
+        
+        def index_of(pos):
+            return f"1.0+{len(doc.get(view_start, pos).decode(encoding, 'replace'))}c"
+        
+        def proxy(cmd, *args):
+            nonlocal view_end
+            if not mirroring:
+                data = None
+                if cmd == "insert" and len(args) >= 2 or cmd == "replace" and len(args) >= 3:
+                    try:
+                        data = "".join(args[1::2] if cmd == "insert" else args[2::2]).encode(encoding)
+                    except UnicodeEncodeError:
+                        text.bell()  # not representable in this page's encoding: refused
+                        return ""
+                if cmd in ("delete", "replace") and args:
+                    i1 = clamp(args[0])
+                    i2 = clamp(args[1]) if len(args) > 1 else clamp(f"{i1}+1c")
+                    if tk_call("compare", i1, "<", i2):
+                        n = len(tk_call("get", i1, i2).encode(encoding))
+                        doc.delete(offset(i1), n)
+                        view_end -= n
+                if data is not None:
+                    index = clamp(args[0])
+                    doc.insert(offset(index), data)
+                    view_end += len(data)
+            return tk_call(cmd, *args)
+        
+        text.tk.createcommand(text._w, proxy)
+        
+        def page_end(start):
+            if doc.length - start <= EDITOR_PAGE:
+                return doc.length
+            probe = doc.get(start + EDITOR_PAGE, start + EDITOR_PAGE + 4096)
+            nl = probe.find(b"\n")
+            if nl != -1:
+                return start + EDITOR_PAGE + nl + 1
+            k = 0
+            while k < len(probe) and 0x80 <= probe[k] < 0xC0:  # not inside a UTF-8 character
+                k += 1
+            return start + EDITOR_PAGE + k
+        
+        def page_start(pos):
+            """Start of the page holding byte `pos`: right after a line break."""
+            chunk = doc.get(max(0, pos - 4096), pos)
+            nl = chunk.rfind(b"\n")
+            return pos - len(chunk) + nl + 1 if nl != -1 else max(0, pos - len(chunk))
+        
+        def show(start):
+            nonlocal view_start, view_end, encoding, mirroring
+            end = page_end(start)
+            data = doc.get(start, end)
+            try:
+                encoding = "utf-8"
+                content = data.decode(encoding)
+            except UnicodeDecodeError:
+                encoding = "latin-1"  # this page only: keeps every byte, so offsets stay exact
+                content = data.decode(encoding)
+            mirroring = True
+            tk_call("delete", "1.0", "end")
+            tk_call("insert", "1.0", content)
+            mirroring = False
+            view_start, view_end = start, end
+            label = f"{format_size(view_start)} - {format_size(view_end)} / {format_size(doc.length)}" if doc.length > EDITOR_PAGE else ""
+            page_label.configure(text=f"{label} (latin-1)" if encoding != "utf-8" else label)
+        
+        def apply(changes):
+            """Mirror undo/redo changes into the widget."""
+            nonlocal mirroring, view_end
+            outside = None
+            mirroring = True
+            for pos, removed, data in changes:
+                if view_start <= pos and pos + removed <= view_end:
+                    i1 = index_of(pos)
+                    count = size = 0
+                    for ch in tk_call("get", i1, f"{i1}+{removed}c"):
+                        if size >= removed:
+                            break
+                        size += len(ch.encode(encoding))
+                        count += 1
+                    tk_call("delete", i1, f"{i1}+{count}c")
+                    tk_call("insert", i1, data.decode(encoding, "replace"))
+                    view_end += len(data) - removed
+                else:
+                    outside = pos
+            mirroring = False
+            if outside is not None:
+                show(page_start(outside))
+            if changes:
+                pos, removed, data = changes[-1]
+                text.mark_set("insert", index_of(min(pos + len(data), view_end)))
+                text.see("insert")
+        
+        def undo(event=None):
+            apply(doc.undo())
+            return "break"
+        
+        def redo(event=None):
+            apply(doc.redo())
+            return "break"
+        
+        for seq in ("<Control-z>", "<Command-z>"):
+            text.bind(seq, undo)
+        for seq in ("<Control-y>", "<Control-Z>", "<Command-Z>"):
+            text.bind(seq, redo)
+        
+        def load(path):
+            nonlocal doc
+            try:
+                new_doc = PieceTable(path)
+            except OSError as e:
+                messagebox.showerror("Error", str(e))
+                return False
+            doc.close()
+            doc = new_doc
+            win.title(f"Text Editor - {os.path.basename(path)}" if path else "Text Editor")
+            return True
+        
+        def open_file():
+            path = filedialog.askopenfilename(parent=win)
+            if path and load(path):
+                show(0)
+        
         def save_file():
-            path = filedialog.asksaveasfilename(defaultextension=".txt")
+            path = doc.path or filedialog.asksaveasfilename(parent=win, defaultextension=".txt")
             if path:
-                with open(path, "w", encoding="utf-8") as f:
-                    f.write(text.get("1.0", "end"))
+                # Pieces go straight to disk; the temp file keeps the mapped original intact
+                tmp = path + ".tmp"
+                try:
+                    with open(tmp, "wb") as f:
+                        doc.write_to(f)
+                    os.replace(tmp, path)
+                except OSError as e:
+                    messagebox.showerror("Error", str(e))
+                    return
+                # The pieces stay valid: the replaced file stays mapped until the
+                # window closes (read in memory on Windows), so undo/redo survive
+                doc.path = path
+                doc.modified = False
+                win.title(f"Text Editor - {os.path.basename(path)}")
                 messagebox.showinfo("Saved", f"File saved: {path}")
         
+        def capture():
+            state = {"path": doc.path or "", "view": view_start}
+            # Unsaved edits of big files are not kept: they would bloat the session
+            if not doc.path or (doc.modified and doc.length <= EDITOR_PAGE):
+                data = doc.get()
+                try:
+                    state["text"], state["encoding"] = data.decode("utf-8"), "utf-8"
+                except UnicodeDecodeError:
+                    state["text"], state["encoding"] = data.decode("latin-1"), "latin-1"
+            return state
+        
+        def close(event):
+            if event.widget is win:
+                doc.close()
+                try:
+                    text.tk.deletecommand(text._w)
+                except tk.TclError:
+                    pass
+        
         btn_frame = ctk.CTkFrame(frame)
         btn_frame.pack(fill="x", pady=5)
+        ctk.CTkButton(btn_frame, text="📂 Open", command=open_file).pack(side="left", padx=5)
         ctk.CTkButton(btn_frame, text="💾 Save", command=save_file).pack(side="left", padx=5)
+        ctk.CTkButton(btn_frame, text="▶", width=40,
+                      command=lambda: view_end < doc.length and show(view_end)).pack(side="right", padx=5)
+        ctk.CTkButton(btn_frame, text="◀", width=40,
+                      command=lambda: view_start > 0 and show(page_start(max(0, view_start - EDITOR_PAGE)))).pack(side="right", padx=5)
+        page_label = ctk.CTkLabel(btn_frame, text="")
+        page_label.pack(side="right", padx=5)
+        
+        if state:
+            if state.get("path") and os.path.exists(state["path"]):
+                load(state["path"])
+            if "text" in state:
+                doc.delete(0, doc.length)
+                doc.insert(0, state["text"].encode(state.get("encoding", "utf-8")))
+                doc.undo_stack.clear()
+            show(page_start(min(state.get("view", 0), doc.length)))
+        else:
+            show(0)
+        
+        win.bind("<Destroy>", close, add="+")
+        self._track(win, "open_text_editor", capture, lambda: _text_changed(text))
+        return win
+    
+    def open_disk_tool(self, path=None, state=None):
+        """Duplicate finder and biggest files/directories (Recovery)."""
+        win = ctk.CTkToplevel(self.root)
+        win.title("Disk Cleanup")
+        win.geometry("1000x700")
+        
+        frame = ctk.CTkFrame(win)
+        frame.pack(fill="both", expand=True, padx=10, pady=10)
+        
+        path_frame = ctk.CTkFrame(frame)
+        path_frame.pack(fill="x", pady=5)
+        
+        path_var = tk.StringVar(value=path or (state or {}).get("path") or os.path.expanduser("~"))
+        ctk.CTkEntry(path_frame, textvariable=path_var).pack(side="left", fill="x", expand=True, padx=5)
+        
+        status = ctk.CTkLabel(frame, text="Pret", anchor="w")
+        status.pack(fill="x", padx=5)
+        
+        import tkinter.ttk as ttk
+        tabs = ctk.CTkTabview(frame)
+        tabs.pack(fill="both", expand=True)
+        trees = {}
+        for name, columns in [("Doublons", ("Size", "Path")),
+                              ("Fichiers", ("Size", "Path")),
+                              ("Dossiers", ("Size", "Path"))]:
+            tree = ttk.Treeview(tabs.add(name), columns=columns, show="tree headings")
+            tree.column("#0", width=80, stretch=False)
+            for col in columns:
+                tree.heading(col, text=col)
+            tree.column("Size", width=100, stretch=False)
+            tree.pack(fill="both", expand=True)
+            trees[name] = tree
+        
+        analyzer = None
+        found = {"groups": 0, "wasted": 0}
+        
+        def poll(current):
+            if current is not analyzer:
+                return
+            if not win.winfo_exists():
+                current.stop.set()
+                return
+            # Bounded work per tick so the window stays responsive
+            for _ in range(200):
+                try:
+                    event = current.events.get_nowait()
+                except queue.Empty:
+                    break
+                kind = event[0]
+                if kind == "progress":
+                    _, stage, done, total = event
+                    status.configure(text=f"{stage}: {done}/{total}" if total else f"{stage}: {done} fichiers")
+                elif kind == "largest":
+                    for size, p in event[1]:
+                        trees["Fichiers"].insert("", "end", values=(format_size(size), p))
+                    for size, p in event[2]:
+                        trees["Dossiers"].insert("", "end", values=(format_size(size), p))
+                elif kind == "dup":
+                    _, size, paths = event
+                    found["groups"] += 1
+                    found["wasted"] += size * (len(paths) - 1)
+                    group = trees["Doublons"].insert(
+                        "", "end", text=f"x{len(paths)}", values=(format_size(size), ""), open=False, tags=("group",)
+                    )
+                    for p in paths:
+                        trees["Doublons"].insert(group, "end", values=(format_size(size), p))
+                elif kind == "done":
+                    status.configure(
+                        text=f"{event[1]} - {found['groups']} groupes de doublons, "
+                             f"{format_size(found['wasted'])} recuperables"
+                    )
+                    return
+            win.after(100, lambda: poll(current))
+        
+        def start():
+            nonlocal analyzer
+            if analyzer:
+                analyzer.stop.set()
+            for tree in trees.values():
+                tree.delete(*tree.get_children())
+            found.update(groups=0, wasted=0)
+            analyzer = DiskAnalyzer(path_var.get())
+            analyzer.start()
+            status.configure(text="Analyse...")
+            poll(analyzer)
+        
+        def delete_selected():
+            tree = trees[tabs.get()]
+            # Group headers only hold a count, never a path
+            items = [i for i in tree.selection() if "group" not in tree.item(i, "tags")]
+            groups = {tree.parent(i) for i in items if tree.parent(i)}
+            for group in groups:
+                if all(i in items for i in tree.get_children(group)):
+                    messagebox.showerror("Error", "Gardez au moins un fichier de chaque groupe de doublons.")
+                    return
+            paths = [tree.item(i, "values")[1] for i in items]
+            if not paths or not messagebox.askyesno("Supprimer", f"Supprimer {len(paths)} element(s) ?\n" + "\n".join(paths[:10])):
+                return
+            for item, p in zip(items, paths):
+                try:
+                    if os.path.isdir(p):
+                        shutil.rmtree(p)
+                    else:
+                        os.remove(p)
+                    tree.delete(item)
+                except OSError as e:
+                    messagebox.showerror("Error", str(e))
+            for group in groups:
+                if len(tree.get_children(group)) < 2:
+                    tree.delete(group)  # no duplicates left
+        
+        ctk.CTkButton(path_frame, text="▶ Analyser", width=100, command=start).pack(side="right", padx=5)
+        ctk.CTkButton(
+            path_frame, text="■", width=50,
+            command=lambda: analyzer and analyzer.stop.set()
+        ).pack(side="right", padx=5)
+        ctk.CTkButton(frame, text="🗑 Supprimer la selection", command=delete_selected).pack(pady=5)
+        self._track(win, "open_disk_tool", lambda: {"path": path_var.get()})
+        return win
+    
+    def open_transfers(self):
+        if self.host_conn is not None:
+            self.host_conn.send({"op": "transfers"})  # shown by the shell
+            return
+        win = ctk.CTkToplevel(self.root)
+        win.title("Transfers")
+        win.geometry("950x400")
+        
+        frame = ctk.CTkFrame(win)
+        frame.pack(fill="both", expand=True, padx=10, pady=10)
+        
+        import tkinter.ttk as ttk
+        tree = ttk.Treeview(frame, columns=("ID", "Op", "Source", "Destination", "Progress", "Speed", "State"), show="headings")
+        for col in tree["columns"]:
+            tree.heading(col, text=col)
+        for col, width in (("ID", 40), ("Op", 50), ("Progress", 140), ("Speed", 90), ("State", 80)):
+            tree.column(col, width=width, stretch=False)
+        tree.pack(fill="both", expand=True)
+        
+        transfers = self.get_transfers()
+        last = {}  # job id -> (time, done_bytes)
+        
+        def refresh():
+            if not win.winfo_exists():
+                return
+            now = time.monotonic()
+            for job in list(transfers.jobs):
+                iid = str(job["id"])
+                done, total = job["done_bytes"], job["total_bytes"]
+                t0, d0 = last.get(iid, (now, done))
+                speed = (done - d0) / (now - t0) if now > t0 else 0
+                last[iid] = (now, done)
+                progress = f"{format_size(done)} / {format_size(total)}" if total else ""
+                values = (
+                    job["id"], job["op"], job["src"], job["dst"], progress,
+                    f"{format_size(speed)}/s" if job["state"] == "running" else "",
+                    job["error"] or job["state"],
+                )
+                if tree.exists(iid):
+                    tree.item(iid, values=values)
+                else:
+                    tree.insert("", "end", iid=iid, values=values)
+            for iid in tree.get_children():
+                if iid not in {str(j["id"]) for j in transfers.jobs}:
+                    tree.delete(iid)
+            win.after(500, refresh)
+        
+        def selected(action):
+            for iid in tree.selection():
+                action(int(iid))
+        
+        btn_frame = ctk.CTkFrame(frame)
+        btn_frame.pack(fill="x", pady=5)
+        ctk.CTkButton(btn_frame, text="⏸ Pause", command=lambda: selected(transfers.pause)).pack(side="left", padx=5)
+        ctk.CTkButton(btn_frame, text="▶ Reprendre", command=lambda: selected(transfers.resume)).pack(side="left", padx=5)
+        ctk.CTkButton(btn_frame, text="✖ Annuler", command=lambda: selected(transfers.cancel)).pack(side="left", padx=5)
+        ctk.CTkButton(btn_frame, text="Nettoyer", command=transfers.clear_finished).pack(side="right", padx=5)
+        refresh()
+        return win
     
     def open_browser(self):
+                    if not self.profile["qt"]:
+                        messagebox.showinfo("UltraWeB", f"Le navigateur est desactive en mode {self.mode}.")
+                        return
                     # Run PyQt browser in a separate thread to avoid blocking tkinter mainloop
                     def launch_browser():
+                             from ultraweb import QApplication, UltraTabbedBrowser
                              app = QApplication(sys.argv)
                              browser = UltraTabbedBrowser()
                              browser.show()
@@ -360,7 +2315,7 @@ License: ULTFRee™ (Limited)
         
                     threading.Thread(target=launch_browser, daemon=True).start()
     
-    def open_task_manager(self):
+    def open_task_manager(self, state=None):
         win = ctk.CTkToplevel(self.root)
         win.title("Task Manager")
         win.geometry("950x600")
@@ -390,9 +2345,11 @@ License: ULTFRee™ (Limited)
         def loop_refresh():
             while win.winfo_exists():
                 refresh()
-                time.sleep(3)
+                time.sleep(self.profile["taskmgr_interval"])
         
         threading.Thread(target=loop_refresh, daemon=True).start()
+        self._track(win, "open_task_manager")
+        return win
     
     def run(self):
         self.root.mainloop()
@@ -426,57 +2383,6 @@ def boot_menu():
     
     boot.mainloop()
 
-class BrowserTab(QWidget):
-    def __init__(self, url=None):
-        super().__init__()
-        layout = QVBoxLayout(self)
-
-        # Create browser view
-        self.browser = QWebEngineView()
-
-        if url:
-            qurl = QUrl(url)
-            self.browser.setUrl(qurl)
-
-        # Address bar
-        self.url_bar = QLineEdit()
-        if url:
-            self.url_bar.setText(url)
-        self.url_bar.returnPressed.connect(self.load_url)
-
-        layout.addWidget(self.url_bar)
-        layout.addWidget(self.browser)
-
-    def load_url(self):
-        url = self.url_bar.text()
-        if not url.startswith("http"):
-            url = "https://" + url
-        self.browser.setUrl(QUrl(url))
-
-
-class UltraTabbedBrowser(QMainWindow):
-    def __init__(self):
-        super().__init__()
-        self.setWindowTitle("UltraWeB")
-        self.setGeometry(300, 100, 1000, 700)
-
-        self.tabs = QTabWidget()
-        self.setCentralWidget(self.tabs)
-
-        # Add first tab
-        self.add_tab(f"file:///{local_file.replace(os.sep, '/')}")
-
-        # Add button to open new tab
-        new_tab_btn = QPushButton("➕ New Tab")
-        new_tab_btn.clicked.connect(lambda: self.add_tab(f"file:///{local_file.replace(os.sep, '/')}"))
-
-        self.tabs.setCornerWidget(new_tab_btn)
-
-    def add_tab(self, url):
-        new_tab = BrowserTab(url)
-        index = self.tabs.addTab(new_tab, "Tab")
-        self.tabs.setCurrentIndex(index)
-
 
 if __name__ == "__main__":
     boot_menu()
\ No newline at end of file
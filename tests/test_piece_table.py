@@ -0,0 +1,122 @@
+import io
+import os
+import random
+
+import pytest
+
+app = pytest.importorskip("app")
+
+
+@pytest.fixture
+def doc(tmp_path):
+    path = tmp_path / "doc.txt"
+    path.write_bytes(b"hello world\nsecond line\n")
+    table = app.PieceTable(str(path))
+    yield table
+    table.close()
+
+
+def type_text(doc, pos, text):
+    for i, ch in enumerate(text.encode()):
+        doc.insert(pos + i, bytes([ch]))
+
+
+def test_insert_delete(doc):
+    doc.insert(5, b",")
+    doc.delete(0, 1)
+    doc.insert(0, b"H")
+    assert doc.get() == b"Hello, world\nsecond line\n"
+    assert doc.length == len(doc.get())
+    assert doc.get(7, 12) == b"world"
+    assert doc.modified
+
+
+def test_undo_redo(doc):
+    doc.insert(0, b">> \n")
+    doc.delete(4, 6)
+    assert doc.get() == b">> \nworld\nsecond line\n"
+    assert doc.undo() == [(4, 0, b"hello ")]
+    assert doc.get() == b">> \nhello world\nsecond line\n"
+    doc.undo()
+    assert doc.get() == b"hello world\nsecond line\n"
+    assert doc.undo() == []
+    doc.redo()
+    doc.redo()
+    assert doc.get() == b">> \nworld\nsecond line\n"
+    assert doc.redo() == []
+
+
+def test_new_edit_clears_redo(doc):
+    doc.insert(0, b"a\n")
+    doc.undo()
+    doc.insert(0, b"b\n")
+    assert doc.redo() == []
+    assert doc.get().startswith(b"b\n")
+
+
+def test_keystrokes_are_grouped(doc):
+    type_text(doc, 0, "abc")
+    doc.delete(2, 1)
+    doc.delete(1, 1)  # backspace
+    assert len(doc.undo_stack) == 2
+    doc.undo()
+    assert doc.get().startswith(b"abchello")
+    doc.undo()
+    assert doc.get() == b"hello world\nsecond line\n"
+
+
+def test_grouping_stops(doc):
+    type_text(doc, 0, "ab")
+    doc.insert(2, b"\n")  # a new line starts a new group
+    type_text(doc, 10, "x")  # elsewhere
+    assert len(doc.undo_stack) == 3
+    doc.GROUP_DELAY = 0
+    type_text(doc, 0, "yz")
+    assert len(doc.undo_stack) == 5
+
+
+def test_write_to(doc):
+    doc.WRITE_CHUNK = 4
+    doc.insert(11, b"!")
+    doc.delete(0, 6)
+    out = io.BytesIO()
+    doc.write_to(out)
+    assert out.getvalue() == doc.get() == b"world!\nsecond line\n"
+
+
+def test_undo_after_replacing_the_file(doc, tmp_path):
+    # What the editor's Save does: write a temp file and replace the original
+    doc.insert(0, b"# ")
+    tmp = doc.path + ".tmp"
+    with open(tmp, "wb") as f:
+        doc.write_to(f)
+    os.replace(tmp, doc.path)
+    doc.undo()
+    assert doc.get() == b"hello world\nsecond line\n"
+    doc.redo()
+    with open(doc.path, "rb") as f:
+        assert f.read() == doc.get()
+
+
+def test_random_edits(doc):
+    rng = random.Random(1)
+    model = [doc.get()]
+    for _ in range(500):
+        current = model[-1]
+        if rng.random() < 0.6 or not current:
+            pos = rng.randint(0, len(current))
+            data = bytes(rng.choice(b"ab\n") for _ in range(rng.randint(1, 6)))
+            doc.insert(pos, data)
+            model.append(current[:pos] + data + current[pos:])
+        else:
+            pos = rng.randint(0, len(current) - 1)
+            n = rng.randint(1, 6)
+            doc.delete(pos, n)
+            model.append(current[:pos] + current[pos + n:])
+        assert doc.get() == model[-1]
+    while doc.undo():
+        pass
+    assert doc.get() == model[0]
+    while doc.redo():
+        pass
+    assert doc.get() == model[-1]
@@ -0,0 +1,101 @@
+import errno
+import filecmp
+import json
+import os
+import time
+
+import pytest
+
+app = pytest.importorskip("app")
+
+
+def wait_for(queue, job_id, states, timeout=10):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        job = next(j for j in queue.jobs if j["id"] == job_id)
+        if job["state"] in states:
+            return job
+        time.sleep(0.02)
+    raise AssertionError(f"job {job_id} still {job['state']}")
+
+
+@pytest.fixture
+def tree(tmp_path):
+    src = tmp_path / "src"
+    (src / "sub").mkdir(parents=True)
+    for i in range(30):
+        (src / f"f{i}").write_bytes(os.urandom(200 * 1024))
+    (src / "sub" / "big").write_bytes(os.urandom(3 * 1024 * 1024))
+    return src
+
+
+def paused_after(queue, files):
+    """Make `queue` pause its job once `files` files are copied."""
+    copy_file = queue._copy_file
+    count = [0]
+
+    def hook(job, src, dst, size):
+        copy_file(job, src, dst, size)
+        count[0] += 1
+        if count[0] == files:
+            queue.pause(job["id"])
+    queue._copy_file = hook
+
+
+def same_tree(a, b):
+    cmp = filecmp.dircmp(a, b)
+    return not (cmp.left_only or cmp.right_only or cmp.diff_files) and all(
+        same_tree(os.path.join(a, d), os.path.join(b, d)) for d in cmp.common_dirs
+    )
+
+
+def test_pause_resume_directory(tmp_path, tree):
+    queue = app.TransferQueue(str(tmp_path / "transfers.json"), workers=1)
+    paused_after(queue, 5)
+    job = queue.add("copy", str(tree), str(tmp_path / "dst"))
+    wait_for(queue, job["id"], ("paused",))
+    assert len(job["completed"]) == 5
+    assert all("/./" not in p for p in job["completed"])
+
+    queue.resume(job["id"])
+    job = wait_for(queue, job["id"], ("done", "failed"))
+    assert job["state"] == "done", job["error"]
+    assert job["done_bytes"] == job["total_bytes"]
+    assert same_tree(tree, tmp_path / "dst")
+
+
+def test_restart_resumes_directory(tmp_path, tree, monkeypatch):
+    def cross_device(src, dst):
+        raise OSError(errno.EXDEV, "cross-device link")
+    monkeypatch.setattr(app.os, "rename", cross_device)
+    path = str(tmp_path / "transfers.json")
+    queue = app.TransferQueue(path, workers=1)
+    paused_after(queue, 5)
+    job = queue.add("move", str(tree), str(tmp_path / "dst"))
+    wait_for(queue, job["id"], ("paused",))
+    queue.save()
+
+    # As if the app had been killed in the middle of the job
+    with open(path, encoding="utf-8") as f:
+        jobs = json.load(f)
+    jobs[0]["state"] = "running"
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(jobs, f)
+
+    restarted = app.TransferQueue(path, workers=1)
+    job = wait_for(restarted, job["id"], ("done", "failed"))
+    assert job["state"] == "done", job["error"]
+    assert not tree.exists()
+    assert sorted(os.listdir(tmp_path / "dst")) == sorted([f"f{i}" for i in range(30)] + ["sub"])
+    assert (tmp_path / "dst" / "sub" / "big").stat().st_size == 3 * 1024 * 1024
+
+
+def test_existing_destination_is_refused(tmp_path, tree):
+    dst = tmp_path / "dst"
+    dst.mkdir()
+    (dst / "f0").write_bytes(b"keep me")
+    queue = app.TransferQueue(str(tmp_path / "transfers.json"))
+    job = queue.add("copy", str(tree), str(dst))
+    job = wait_for(queue, job["id"], ("done", "failed"))
+    assert job["state"] == "failed"
+    assert (dst / "f0").read_bytes() == b"keep me"
@@ -0,0 +1,336 @@
+#!/usr/bin/env python3
+"""
+UltraWeB - navigateur a onglets d'UltraOS (PyQt5)
+Importe seulement a l'ouverture du navigateur: PyQt est lourd a charger.
+"""
+
+from PyQt5.QtWidgets import (
+    QApplication, QMainWindow, QTabWidget, QWidget,
+    QVBoxLayout, QPushButton, QLineEdit, QHBoxLayout, QCompleter
+)
+from PyQt5.QtWebEngineWidgets import QWebEngineView
+from PyQt5.QtCore import QUrl, QTimer, QStringListModel, Qt
+from collections import OrderedDict
+import html
+import math
+import os
+import queue
+import sqlite3
+import threading
+import time
+local_file = os.path.abspath("newtab.html")
+NEWTAB_URL = f"file:///{local_file.replace(os.sep, '/')}"
+HISTORY_DB = os.path.join(os.path.dirname(os.path.abspath(__file__)), "app_data", "browser.db")
+
+
+def url_key(url):
+    """Normalized form used for matching: no scheme, no "www.", lower case."""
+    key = url.strip().lower()
+    for prefix in ("https://", "http://", "www."):
+        if key.startswith(prefix):
+            key = key[len(prefix):]
+    return key
+
+
+class HistoryStore:
+    """Browsing history and bookmarks in app_data/browser.db (SQLite).
+
+    Writes are queued and committed in batches by a background thread;
+    the GUI thread only reads. Suggestions come from an index on the
+    normalized URL (prefix) and, with SQLite >= 3.34, an FTS5 trigram
+    index (substring). They are ranked by frecency: each visit adds 1 to a
+    weight that halves every HALF_LIFE. The stored score is
+    ln(weight) + t * ln(2) / HALF_LIFE, which keeps the same order over
+    time, so ORDER BY score needs no recomputation.
+    """
+
+    HALF_LIFE = 30 * 86400  # s
+    BATCH = 200
+    FLUSH_DELAY = 0.5  # s
+    PREFIX_SCAN = 2000  # rows looked at per index in a suggestion query
+    CACHE = 256
+
+    def __init__(self, path=HISTORY_DB):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.path = path
+        self.trigram = False
+        self._queue = queue.Queue()
+        self._generation = 0
+        self._cache = OrderedDict()
+        self.db = sqlite3.connect(path)
+        self._setup(self.db)
+        self._writer_thread = threading.Thread(target=self._writer, daemon=True)
+        self._writer_thread.start()
+
+    def _setup(self, db):
+        db.execute("PRAGMA journal_mode=WAL")
+        db.executescript("""
+            CREATE TABLE IF NOT EXISTS urls (
+                id INTEGER PRIMARY KEY,
+                url TEXT UNIQUE NOT NULL,
+                key TEXT NOT NULL,
+                title TEXT NOT NULL DEFAULT '',
+                visits INTEGER NOT NULL DEFAULT 0,
+                last_visit REAL NOT NULL DEFAULT 0,
+                score REAL NOT NULL DEFAULT 0
+            );
+            CREATE INDEX IF NOT EXISTS urls_key ON urls(key);
+            CREATE INDEX IF NOT EXISTS urls_score ON urls(score DESC);
+            CREATE TABLE IF NOT EXISTS bookmarks (
+                url TEXT PRIMARY KEY,
+                title TEXT NOT NULL DEFAULT '',
+                added REAL NOT NULL
+            );
+        """)
+        try:
+            db.executescript("""
+                CREATE VIRTUAL TABLE IF NOT EXISTS urls_tri
+                    USING fts5(key, content='urls', content_rowid='id', tokenize='trigram');
+                CREATE TRIGGER IF NOT EXISTS urls_ai AFTER INSERT ON urls BEGIN
+                    INSERT INTO urls_tri(rowid, key) VALUES (new.id, new.key);
+                END;
+                CREATE TRIGGER IF NOT EXISTS urls_ad AFTER DELETE ON urls BEGIN
+                    INSERT INTO urls_tri(urls_tri, rowid, key) VALUES ('delete', old.id, old.key);
+                END;
+            """)
+            self.trigram = True
+        except sqlite3.OperationalError:
+            pass  # no FTS5/trigram in this SQLite: prefix matching only
+        db.commit()
+
+    # Writes (any thread)
+
+    def visit(self, url, title=""):
+        if url.startswith(("http://", "https://")):
+            self._queue.put(("visit", url, title, time.time()))
+
+    def set_title(self, url, title):
+        self._queue.put(("title", url, title))
+
+    def add_bookmark(self, url, title=""):
+        self._queue.put(("bookmark", url, title, time.time()))
+
+    def remove_bookmark(self, url):
+        self._queue.put(("unbookmark", url))
+
+    def close(self):
+        self._queue.put(None)
+        self._writer_thread.join(timeout=2)
+
+    def _writer(self):
+        db = sqlite3.connect(self.path)
+        k = math.log(2) / self.HALF_LIFE
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.FLUSH_DELAY
+            while batch[-1] is not None and len(batch) < self.BATCH:
+                try:
+                    batch.append(self._queue.get(timeout=max(0, deadline - time.monotonic())))
+                except queue.Empty:
+                    break
+            with db:
+                for op in batch:
+                    if op is None:
+                        break
+                    if op[0] == "visit":
+                        _, url, title, t = op
+                        row = db.execute("SELECT score FROM urls WHERE url = ?", (url,)).fetchone()
+                        weight = math.exp(row[0] - t * k) if row else 0
+                        score = math.log(weight + 1) + t * k
+                        db.execute(
+                            "INSERT INTO urls (url, key, title, visits, last_visit, score) VALUES (?, ?, ?, 1, ?, ?) "
+                            "ON CONFLICT(url) DO UPDATE SET visits = visits + 1, last_visit = excluded.last_visit, "
+                            "score = excluded.score, title = CASE WHEN excluded.title != '' THEN excluded.title ELSE title END",
+                            (url, url_key(url), title, t, score)
+                        )
+                    elif op[0] == "title":
+                        db.execute("UPDATE urls SET title = ? WHERE url = ?", (op[2], op[1]))
+                        db.execute("UPDATE bookmarks SET title = ? WHERE url = ?", (op[2], op[1]))
+                    elif op[0] == "bookmark":
+                        db.execute("INSERT OR REPLACE INTO bookmarks (url, title, added) VALUES (?, ?, ?)", op[1:])
+                    elif op[0] == "unbookmark":
+                        db.execute("DELETE FROM bookmarks WHERE url = ?", (op[1],))
+            self._generation += 1
+            if batch[-1] is None:
+                db.close()
+                return
+
+    # Reads (GUI thread)
+
+    def suggest(self, text, limit=8):
+        """Best matching URLs for what is typed in the address bar."""
+        key = url_key(text)
+        if not key:
+            return []
+        cache_key = (key, limit, self._generation)
+        if cache_key in self._cache:
+            self._cache.move_to_end(cache_key)
+            return self._cache[cache_key]
+
+        urls = [row[0] for row in self.db.execute(
+            "SELECT url FROM bookmarks WHERE url LIKE ? ESCAPE '\\' LIMIT ?",
+            ("%" + key.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%", limit)
+        )]
+        # Prefix matches among the most frecent URLs, plus the first ones in key order
+        end = key + "\U0010ffff"
+        urls += [row[0] for row in self.db.execute(
+            "SELECT url FROM ("
+            "  SELECT url, score FROM (SELECT url, key, score FROM urls ORDER BY score DESC LIMIT ?)"
+            "  WHERE key >= ? AND key < ?"
+            "  UNION"
+            "  SELECT url, score FROM (SELECT url, score FROM urls WHERE key >= ? AND key < ? LIMIT ?)"
+            ") ORDER BY score DESC LIMIT ?",
+            (self.PREFIX_SCAN, key, end, key, end, self.PREFIX_SCAN, limit)
+        )]
+        if len(set(urls)) < limit and self.trigram and len(key) >= 3:
+            urls += [row[0] for row in self.db.execute(
+                "SELECT url FROM (SELECT u.url, u.score FROM urls_tri JOIN urls u ON u.id = urls_tri.rowid "
+                "WHERE urls_tri MATCH ? LIMIT ?) ORDER BY score DESC LIMIT ?",
+                ('"' + key.replace('"', '""') + '"', self.PREFIX_SCAN, limit)
+            )]
+        result = list(OrderedDict.fromkeys(urls))[:limit]
+
+        self._cache[cache_key] = result
+        if len(self._cache) > self.CACHE:
+            self._cache.popitem(last=False)
+        return result
+
+    def top_sites(self, limit=8):
+        return self.db.execute(
+            "SELECT url, title FROM urls ORDER BY score DESC LIMIT ?", (limit,)
+        ).fetchall()
+
+    def bookmarks(self, limit=50):
+        return self.db.execute(
+            "SELECT url, title FROM bookmarks ORDER BY added DESC LIMIT ?", (limit,)
+        ).fetchall()
+
+    def is_bookmarked(self, url):
+        return self.db.execute("SELECT 1 FROM bookmarks WHERE url = ?", (url,)).fetchone() is not None
+
+
+def new_tab_html(history):
+    """newtab.html with its links replaced by bookmarks and top sites."""
+    with open(local_file, "r", encoding="utf-8") as f:
+        page = f.read()
+    sites = history.bookmarks(4) + history.top_sites(8) if history else []
+    seen = set()
+    links = []
+    for url, title in sites:
+        if url not in seen:
+            seen.add(url)
+            links.append(f'<a href="{html.escape(url)}">{html.escape(title or url_key(url).split("/")[0])}</a>')
+    start, end = page.find("<!-- top-sites -->"), page.find("<!-- /top-sites -->")
+    if links and start != -1 and end != -1:
+        page = page[:start] + "\n    ".join(links[:10]) + "\n    " + page[end:]
+    return page
+
+
+class BrowserTab(QWidget):
+    def __init__(self, url=None, history=None):
+        super().__init__()
+        self.history = history
+        layout = QVBoxLayout(self)
+
+        # Create browser view
+        self.browser = QWebEngineView()
+
+        if url == NEWTAB_URL:
+            self.browser.setHtml(new_tab_html(history), QUrl(NEWTAB_URL))
+        elif url:
+            qurl = QUrl(url)
+            self.browser.setUrl(qurl)
+
+        # Address bar
+        self.url_bar = QLineEdit()
+        if url:
+            self.url_bar.setText(url)
+        self.url_bar.returnPressed.connect(self.load_url)
+
+        self.bookmark_btn = QPushButton("☆")
+        self.bookmark_btn.setFixedWidth(32)
+        self.bookmark_btn.clicked.connect(self.toggle_bookmark)
+
+        if history:
+            self.suggestions = QStringListModel(self)
+            completer = QCompleter(self.suggestions, self)
+            completer.setCompletionMode(QCompleter.UnfilteredPopupCompletion)
+            completer.setCaseSensitivity(Qt.CaseInsensitive)
+            completer.activated[str].connect(self.open_suggestion)
+            self.url_bar.setCompleter(completer)
+            self.url_bar.textEdited.connect(self.update_suggestions)
+            self.browser.urlChanged.connect(self.on_url_changed)
+            self.browser.titleChanged.connect(lambda title: history.set_title(self.browser.url().toString(), title))
+
+        bar = QHBoxLayout()
+        bar.addWidget(self.url_bar)
+        bar.addWidget(self.bookmark_btn)
+        layout.addLayout(bar)
+        layout.addWidget(self.browser)
+
+    def load_url(self):
+        url = self.url_bar.text()
+        if not url.startswith("http"):
+            url = "https://" + url
+        self.browser.setUrl(QUrl(url))
+
+    def update_suggestions(self, text):
+        self.suggestions.setStringList(self.history.suggest(text))
+        self.url_bar.completer().complete()
+
+    def open_suggestion(self, url):
+        self.url_bar.setText(url)
+        self.load_url()
+
+    def on_url_changed(self, qurl):
+        url = qurl.toString()
+        if url.startswith(("http://", "https://")):
+            self.url_bar.setText(url)
+            self.history.visit(url)  # the title follows with titleChanged
+        self.bookmark_btn.setText("★" if self.history.is_bookmarked(url) else "☆")
+
+    def toggle_bookmark(self):
+        if not self.history:
+            return
+        url = self.browser.url().toString()
+        if self.bookmark_btn.text() == "★":
+            self.history.remove_bookmark(url)
+            self.bookmark_btn.setText("☆")
+        elif url.startswith(("http://", "https://")):
+            self.history.add_bookmark(url, self.browser.title())
+            self.bookmark_btn.setText("★")
+
+
+class UltraTabbedBrowser(QMainWindow):
+    def __init__(self):
+        super().__init__()
+        self.setWindowTitle("UltraWeB")
+        self.setGeometry(300, 100, 1000, 700)
+
+        try:
+            self.history = HistoryStore()
+        except sqlite3.Error as e:
+            print(f"History error: {e}")
+            self.history = None
+
+        self.tabs = QTabWidget()
+        self.setCentralWidget(self.tabs)
+
+        # Add first tab
+        self.add_tab(NEWTAB_URL)
+
+        # Add button to open new tab
+        new_tab_btn = QPushButton("➕ New Tab")
+        new_tab_btn.clicked.connect(lambda: self.add_tab(NEWTAB_URL))
+
+        self.tabs.setCornerWidget(new_tab_btn)
+
+    def add_tab(self, url):
+        new_tab = BrowserTab(url, self.history)
+        index = self.tabs.addTab(new_tab, "Tab")
+        self.tabs.setCurrentIndex(index)
+
+    def closeEvent(self, event):
+        if self.history:
+            self.history.close()
+        super().closeEvent(event)
@@ -59,7 +59,7 @@ class UltraOS:
         self._start_clock()
         if self.mode == "normal":
             threading.Timer(30, self.fake_kernel_panic).start()
-        threading.Thread(target=self.flicker_title, daemon=True).start()
+        self.root.after(800, self.flicker_title)
 
     def _setup_ui(self):
         self.main = ctk.CTkFrame(self.root, fg_color=COLORS["bg"])
@@ -71,17 +71,19 @@ class UltraOS:
         self._create_taskbar()
         self._create_start_menu()
         self._create_title()
-        self.title_label = ctk.CTkLabel(
-            self.canvas, text="UltraOS - Nova", 
-            font=("Inter", 64, "bold"),
-            text_color=COLORS["accent"]
+
+    def _create_title(self):
+        # Canvas text: a colour change only repaints the title's own bbox
+        self.title_label = self.canvas.create_text(
+            0, 0, text="UltraOS - Nova",
+            font=("Inter", 64, "bold"), fill=COLORS["accent"]
         )
-        self.title_label.place(relx=0.5, rely=0.1, anchor="center")
+        self.canvas.bind("<Configure>", lambda e: self.canvas.coords(self.title_label, e.width / 2, e.height * 0.1))
 
     def _load_wallpaper(self):
         try:
-            self.wall = create_wallpaper(1920, 1080)
-            wall = self.wall
+            # Keep only the PhotoImage: the PIL image is 6 MB we never reuse
+            wall = create_wallpaper(1920, 1080)
             bio = io.BytesIO()
             wall.save(bio, format='PNG')
             bio.seek(0)
@@ -167,13 +169,11 @@ class UltraOS:
         threading.Thread(target=update, daemon=True).start()
 
     def flicker_title(self):
-        while True:
-            time.sleep(0.8)
-            if self.title_label:
-                self.title_label.configure(text_color=COLORS["accent_hover"])
-            time.sleep(0.2)
-            if self.title_label:
-                self.title_label.configure(text_color=COLORS["accent"])
+        if not self.root.winfo_exists():
+            return
+        self.canvas.itemconfigure(self.title_label, fill=COLORS["accent_hover"])
+        self.root.after(200, lambda: self.canvas.itemconfigure(self.title_label, fill=COLORS["accent"]))
+        self.root.after(1000, self.flicker_title)
 
     def fake_kernel_panic(self):
         if self.root.winfo_exists():